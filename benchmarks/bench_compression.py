@@ -0,0 +1,103 @@
+"""
+Measures the CPU-versus-bytes trade-off of response compression.
+
+Typical list pages (``GET /api/contacts/?limit=N``, all fields) are serialized
+the way the endpoint does it and compressed with every installed coding and a
+range of levels, through the same compressors as ``CompressionMiddleware``:
+
+* ``page``: the whole page in one chunk, as a regular response.
+* ``stream``: an NDJSON export in chunks of ``--chunk-rows`` rows, each chunk
+  compressed and flushed on arrival; compare its ratio with ``page`` to see what
+  incremental flushing costs.
+
+CPU time is process time per body; no database is needed:
+
+    python -m benchmarks.bench_compression --rows 20 100 1000 --repeat 200
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+from benchmarks.common import synthetic_contact
+
+from src.core.compression import COMPRESSORS
+from src.core.encoding import dumps
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 6, 11), "zstd": (1, 3, 9, 19)}
+
+
+def contact_rows(count: int, seed: int = 42) -> List[dict]:
+    rng = random.Random(seed)
+    return [
+        {"id": index + 1, **synthetic_contact(index, rng).model_dump(mode="json")}
+        for index in range(count)
+    ]
+
+
+def compress_chunks(coding: str, level: int, chunks: List[bytes]) -> int:
+    """Compresses ``chunks`` as one body and returns the compressed size."""
+    compressor = COMPRESSORS[coding](level)
+    size = sum(len(compressor.compress(chunk)) for chunk in chunks)
+    return size + len(compressor.finish())
+
+
+def measure(coding: str, level: int, chunks: List[bytes], repeat: int) -> Dict[str, float]:
+    size = compress_chunks(coding, level, chunks)
+    started = time.process_time()
+    for _ in range(repeat):
+        compress_chunks(coding, level, chunks)
+    cpu_us = (time.process_time() - started) / repeat * 1e6
+    original = sum(len(chunk) for chunk in chunks)
+    return {
+        "bytes": size,
+        "ratio": original / size,
+        "cpu_us": cpu_us,
+        # Throughput of the original bytes, comparable across page sizes.
+        "mb_per_sec": original / cpu_us if cpu_us else 0.0,
+    }
+
+
+def run(page_sizes: List[int], chunk_rows: int, repeat: int) -> dict:
+    bodies: Dict[str, List[bytes]] = {}
+    for rows in page_sizes:
+        page = contact_rows(rows)
+        bodies[f"page{rows}"] = [dumps(page)]
+        bodies[f"stream{rows}"] = [
+            b"".join(dumps(row) + b"\n" for row in page[start:start + chunk_rows])
+            for start in range(0, rows, chunk_rows)
+        ]
+    cases: Dict[str, Dict[str, dict]] = {}
+    for name, chunks in bodies.items():
+        cases[name] = {"original_bytes": sum(len(chunk) for chunk in chunks), "codings": {}}
+        for coding in COMPRESSORS:
+            for level in LEVELS[coding]:
+                cases[name]["codings"][f"{coding}-{level}"] = measure(coding, level, chunks, repeat)
+    return {"repeat": repeat, "chunk_rows": chunk_rows, "available": list(COMPRESSORS), "cases": cases}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 20, 100, 1000], help="page sizes")
+    parser.add_argument("--chunk-rows", type=int, default=100, help="rows per streamed chunk")
+    parser.add_argument("--repeat", type=int, default=100, help="timed compressions per case")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.chunk_rows, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"codings: {', '.join(results['available'])}; CPU time per body")
+    for name, case_ in results["cases"].items():
+        print(f"  {name} ({case_['original_bytes']} bytes)")
+        for coding, stats in case_["codings"].items():
+            print(
+                f"    {coding:<8} {stats['bytes']:>9} bytes  x{stats['ratio']:<5.1f}"
+                f" {stats['cpu_us']:>9.1f} us  {stats['mb_per_sec']:>7.1f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
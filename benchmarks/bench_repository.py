@@ -0,0 +1,135 @@
+"""
+Micro-benchmarks of the functions in ``src.repository.contacts``.
+
+Each case runs one repository call per iteration in a fresh session, like a
+request would, against a freshly seeded scratch database:
+
+    python -m benchmarks.bench_repository --contacts 10000 --iterations 200
+    python -m benchmarks.bench_repository --json results/repository.json
+
+Write cases leave the table as they found it: contacts created by ``create`` are
+deleted by ``remove``.
+"""
+import argparse
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.common import (
+    FIRST_NAMES,
+    Timer,
+    add_database_arguments,
+    create_engine,
+    result_document,
+    seed_contacts,
+    summarize,
+    synthetic_contact,
+    write_results,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Contact
+from src.repository import contacts as repository_contacts
+from src.repository.cache import contact_cache
+from src.schemas import ContactUpdate
+
+PAGE_SIZE = 20
+
+
+async def run(args) -> Dict[str, Any]:
+    engine = create_engine(args.db_url)
+    await seed_contacts(engine, args.contacts, args.seed)
+    rng = random.Random(args.seed)
+    cases: Dict[str, Dict[str, Any]] = {}
+
+    def contact_ids() -> int:
+        return rng.randint(1, args.contacts)
+
+    async def bench(
+        name: str, call: Callable[[AsyncSession], Awaitable[Any]], commit: bool = False
+    ) -> None:
+        timer = Timer()
+        for iteration in range(-args.warmup, args.iterations):
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                if iteration < 0:
+                    await call(db)
+                    if commit:
+                        await db.commit()
+                    continue
+                with timer:
+                    await call(db)
+                    if commit:
+                        await db.commit()
+        cases[name] = summarize(timer.samples)
+
+    contact_cache.enabled = False
+    await bench("list", lambda db: repository_contacts.get_contacts(0, PAGE_SIZE, db))
+    await bench(
+        "list_fields",
+        lambda db: repository_contacts.get_contacts(
+            0, PAGE_SIZE, db, fields=list(repository_contacts.FIELD_COLUMNS)
+        ),
+    )
+    await bench(
+        "search",
+        lambda db: repository_contacts.search_contacts(rng.choice(FIRST_NAMES)[:4], 0, PAGE_SIZE, db),
+    )
+    await bench(
+        "search_prefix",
+        lambda db: repository_contacts.search_contacts(rng.choice(FIRST_NAMES)[:2], 0, PAGE_SIZE, db),
+    )
+    await bench("birthdays", lambda db: repository_contacts.get_upcoming_birthdays(db, days=7, limit=100))
+    await bench("get_by_id", lambda db: repository_contacts.get_contact_by_id(contact_ids(), db))
+
+    contact_cache.enabled = True
+    contact_cache.local.clear()
+    await bench("get_by_id_cached", lambda db: repository_contacts.get_contact_by_id(rng.randint(1, 100), db))
+    contact_cache.enabled = False
+
+    created: List[int] = []
+    next_index = args.contacts
+
+    async def create(db: AsyncSession) -> None:
+        nonlocal next_index
+        contact = await repository_contacts.create_contact(synthetic_contact(next_index, rng), db)
+        created.append(contact.id)
+        next_index += 1
+
+    # `ContactUpdate` requires `email` and `birthday`, so updates resend the
+    # stored values together with a new first name.
+    async with AsyncSession(engine) as db:
+        stored = {
+            row.id: row
+            for row in await db.execute(select(Contact.id, Contact.email, Contact.birthday))
+        }
+
+    async def update(db: AsyncSession) -> None:
+        contact = stored[contact_ids()]
+        body = ContactUpdate(
+            first_name=rng.choice(FIRST_NAMES), email=contact.email, birthday=contact.birthday
+        )
+        await repository_contacts.update_contact(contact.id, body, db)
+
+    await bench("create", create, commit=True)
+    await bench("update", update, commit=True)
+    await bench("remove", lambda db: repository_contacts.remove_contact(created.pop(), db), commit=True)
+
+    await engine.dispose()
+    return result_document(
+        "repository", args, cases, iterations=args.iterations, warmup=args.warmup, page_size=PAGE_SIZE
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_database_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per case")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed calls per case")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON (`-` for stdout)")
+    args = parser.parse_args()
+    write_results(asyncio.run(run(args)), args.json)
+
+
+if __name__ == "__main__":
+    main()
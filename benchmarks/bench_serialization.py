@@ -0,0 +1,110 @@
+"""
+Compares the two ways a page of contacts can be turned into a JSON response.
+
+* ``orm``: ``Contact`` ORM objects, validated through ``List[ContactResponse]``
+  and rendered the way FastAPI's ``response_model`` path does it.
+* ``rows``: plain column rows (the ``fields=`` path of the list endpoints),
+  encoded directly with ``src.core.encoding.dumps``.
+
+Both are measured on serialization alone and together with the repository
+query, against an in-memory SQLite database:
+
+    python -m benchmarks.bench_serialization --rows 100 --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Callable, List
+
+from benchmarks.common import create_engine, seed_contacts
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.encoding import dumps
+from src.repository import contacts as repository_contacts
+from src.schemas import ContactResponse
+
+RESPONSE_ADAPTER = TypeAdapter(List[ContactResponse])
+ALL_FIELDS = list(repository_contacts.FIELD_COLUMNS)
+
+
+def render_orm(contacts: list) -> bytes:
+    # What FastAPI does for `response_model=List[ContactResponse]`: validate,
+    # dump to JSON-compatible Python, then json.dumps in JSONResponse.
+    validated = RESPONSE_ADAPTER.validate_python(contacts, from_attributes=True)
+    content = RESPONSE_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def render_rows(rows: list) -> bytes:
+    return dumps(rows)
+
+
+def measure(fn: Callable[[], object], repeat: int) -> float:
+    """Returns the mean wall time of one call in microseconds."""
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def measure_async(fn, repeat: int) -> float:
+    await fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def run(rows: int, repeat: int) -> dict:
+    engine = create_engine("sqlite+aiosqlite://")
+    await seed_contacts(engine, rows)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+
+        contacts = (await repository_contacts.get_contacts(0, rows, db)).items
+        field_rows = (await repository_contacts.get_contacts(0, rows, db, fields=ALL_FIELDS)).items
+        assert json.loads(render_orm(contacts)) == json.loads(render_rows(field_rows))
+
+        async def orm_endpoint():
+            db.expunge_all()
+            page = await repository_contacts.get_contacts(0, rows, db)
+            return render_orm(page.items)
+
+        async def rows_endpoint():
+            page = await repository_contacts.get_contacts(0, rows, db, fields=ALL_FIELDS)
+            return render_rows(page.items)
+
+        results = {
+            "serialize_orm_us": measure(lambda: render_orm(contacts), repeat),
+            "serialize_rows_us": measure(lambda: render_rows(field_rows), repeat),
+            "endpoint_orm_us": await measure_async(orm_endpoint, repeat),
+            "endpoint_rows_us": await measure_async(rows_endpoint, repeat),
+        }
+    await engine.dispose()
+    results["serialize_speedup"] = results["serialize_orm_us"] / results["serialize_rows_us"]
+    results["endpoint_speedup"] = results["endpoint_orm_us"] / results["endpoint_rows_us"]
+    return {"rows": rows, "repeat": repeat, **results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100, help="contacts per page")
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per case")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rows, args.repeat))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.rows} rows per page, {args.repeat} calls per case (mean per call)")
+    print(f"  serialize  orm: {results['serialize_orm_us']:9.1f} us   rows: {results['serialize_rows_us']:9.1f} us"
+          f"   x{results['serialize_speedup']:.1f}")
+    print(f"  endpoint   orm: {results['endpoint_orm_us']:9.1f} us   rows: {results['endpoint_rows_us']:9.1f} us"
+          f"   x{results['endpoint_speedup']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Measures the CPU cost per call of the repository read statements, built per call
+versus pre-built with bind parameters.
+
+* ``before``: a new ``select()`` is built for every call with the values inlined,
+  as the repository did before; SQLAlchemy then has to compute its cache key to
+  find the compiled SQL.
+* ``after``: the statement of the call's shape comes from the repository's
+  memoized builders and only the parameter values change; its cache key is
+  computed once.
+
+``build`` measures statement preparation alone (construction and cache key);
+``execute`` also runs the statement and fetches the rows, against an in-memory
+SQLite database. Both report process CPU time, not wall time:
+
+    python -m benchmarks.bench_statements --repeat 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, Tuple
+
+from benchmarks.common import FIRST_NAMES, create_engine, seed_contacts
+from sqlalchemy import Integer, case, cast, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Contact, birthday_key
+from src.repository import contacts as repository_contacts
+from src.repository.pagination import keyset_after
+
+PAGE_SIZE = 20
+SEARCH_QUERY = FIRST_NAMES[0][:4]
+
+# (statement, bind parameters) for one call
+Call = Tuple[object, Dict[str, object]]
+
+
+def _legacy_search(query: str, dialect: str):
+    # The per-call search statement, with the query inlined as literals.
+    columns = repository_contacts.SEARCH_COLUMNS
+    escape = repository_contacts.LIKE_ESCAPE
+    prefix = repository_contacts._escape_like(query.lower()) + "%"
+    contains = "%" + repository_contacts._escape_like(query) + "%"
+    tier = case(
+        (or_(*(func.lower(column) == query.lower() for column in columns)), 3),
+        (or_(*(func.lower(column).like(prefix, escape=escape) for column in columns)), 2),
+        else_=1,
+    )
+    rank = tier * repository_contacts.RANK_TIER_SIZE
+    if dialect == "postgresql":
+        similarity = func.greatest(*(func.similarity(column, query) for column in columns))
+        rank = rank + cast(similarity * (repository_contacts.RANK_TIER_SIZE - 1), Integer)
+    sort_rank = -rank
+    return (
+        select(Contact, sort_rank.label("sort_rank"))
+        .where(or_(*(column.ilike(contains, escape=escape) for column in columns)))
+        .order_by(sort_rank, Contact.id)
+        .limit(PAGE_SIZE + 1)
+    )
+
+
+def legacy_calls(dialect: str) -> Dict[str, Callable[[], Call]]:
+    today = date.today()
+
+    def birthdays() -> Call:
+        # First segment of the window, as the per-call code built it.
+        end_date = today + timedelta(days=7)
+        if end_date.year == today.year:
+            segment = Contact.birthday_md.between(birthday_key(today), birthday_key(end_date))
+        else:
+            segment = Contact.birthday_md >= birthday_key(today)
+        order = repository_contacts.BIRTHDAY_ORDER
+        return select(Contact).where(segment).order_by(*order).limit(PAGE_SIZE + 1), {}
+
+    return {
+        "list": lambda: (select(Contact).order_by(Contact.id).limit(PAGE_SIZE + 1), {}),
+        "list_cursor": lambda: (
+            select(Contact).where(keyset_after([Contact.id], [PAGE_SIZE])).order_by(Contact.id).limit(PAGE_SIZE + 1),
+            {},
+        ),
+        "search": lambda: (_legacy_search(SEARCH_QUERY, dialect), {}),
+        "birthdays": birthdays,
+        "get_by_id": lambda: (select(Contact).where(Contact.id == 1), {}),
+    }
+
+
+def prebuilt_calls(dialect: str) -> Dict[str, Callable[[], Call]]:
+    today = date.today()
+    repo = repository_contacts
+
+    def birthdays() -> Call:
+        wraps, window = repo._birthday_window(today, 7)
+        stmt = repo._birthdays_statement(None, wraps, 0, False)
+        return stmt, {**window, **repo._paging_params(PAGE_SIZE, 0)}
+
+    return {
+        "list": lambda: (repo._list_statement(None, "first"), repo._paging_params(PAGE_SIZE, 0)),
+        "list_cursor": lambda: (
+            repo._list_statement(None, "cursor"),
+            repo._paging_params(PAGE_SIZE, 0, (PAGE_SIZE,)),
+        ),
+        "search": lambda: (
+            repo._search_statement(None, repo._is_short_query(SEARCH_QUERY), "first", dialect),
+            {**repo._paging_params(PAGE_SIZE, 0), **repo._search_params(SEARCH_QUERY)},
+        ),
+        "birthdays": birthdays,
+        "get_by_id": lambda: (repo._CONTACT_BY_ID, {"contact_id": 1}),
+    }
+
+
+def build_cost(make_call: Callable[[], Call], repeat: int) -> float:
+    """Returns the mean CPU time of building one call's statement, in microseconds."""
+    def once() -> None:
+        stmt, _ = make_call()
+        # What `Session.execute` does first to look up the compiled SQL.
+        stmt._generate_cache_key()
+
+    once()
+    started = time.process_time()
+    for _ in range(repeat):
+        once()
+    return (time.process_time() - started) / repeat * 1e6
+
+
+async def execute_cost(db: AsyncSession, make_call: Callable[[], Call], repeat: int) -> float:
+    """Returns the mean CPU time of building and running one call, in microseconds."""
+    async def once() -> None:
+        stmt, params = make_call()
+        (await db.execute(stmt, params)).all()
+        db.expunge_all()
+
+    await once()
+    started = time.process_time()
+    for _ in range(repeat):
+        await once()
+    return (time.process_time() - started) / repeat * 1e6
+
+
+async def run(contacts: int, repeat: int) -> dict:
+    engine = create_engine("sqlite+aiosqlite://")
+    await seed_contacts(engine, contacts)
+    dialect = engine.dialect.name
+    before, after = legacy_calls(dialect), prebuilt_calls(dialect)
+    cases: Dict[str, Dict[str, float]] = {}
+    async with AsyncSession(engine) as db:
+        for name in before:
+            case_ = {
+                "build_before_us": build_cost(before[name], repeat),
+                "build_after_us": build_cost(after[name], repeat),
+                "execute_before_us": await execute_cost(db, before[name], repeat),
+                "execute_after_us": await execute_cost(db, after[name], repeat),
+            }
+            case_["build_speedup"] = case_["build_before_us"] / case_["build_after_us"]
+            case_["execute_speedup"] = case_["execute_before_us"] / case_["execute_after_us"]
+            cases[name] = case_
+    await engine.dispose()
+    return {"contacts": contacts, "repeat": repeat, "page_size": PAGE_SIZE, "cases": cases}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--contacts", type=int, default=1000, help="contacts to seed")
+    parser.add_argument("--repeat", type=int, default=1000, help="timed calls per case")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.contacts, args.repeat))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.repeat} calls per case, CPU time per call (before -> after)")
+    for name, case_ in results["cases"].items():
+        print(
+            f"  {name:<12} build {case_['build_before_us']:8.1f} -> {case_['build_after_us']:7.1f} us"
+            f" x{case_['build_speedup']:<6.1f}"
+            f" execute {case_['execute_before_us']:8.1f} -> {case_['execute_after_us']:7.1f} us"
+            f" x{case_['execute_speedup']:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
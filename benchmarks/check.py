@@ -0,0 +1,103 @@
+"""
+Gates benchmark results on regression thresholds.
+
+Checks the JSON written by ``bench_repository`` / ``loadtest`` (``--json``)
+against absolute limits, and optionally against a baseline run:
+
+    python -m benchmarks.check results/repository.json results/load.json
+    python -m benchmarks.check results/load.json --baseline main/load.json --tolerance 0.2
+
+Exits with status 1 when any limit is exceeded, so it can fail a CI job. The
+default limits in ``thresholds.json`` are calibrated for SQLite and the default
+data size; keep a thresholds file per environment for other setups.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(__file__), "thresholds.json")
+
+# Baseline comparison: latencies may not grow, throughput may not drop, by more
+# than the tolerance.
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms")
+HIGHER_IS_BETTER = ("ops_per_sec",)
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as source:
+        return json.load(source)
+
+
+def check_thresholds(results: Dict[str, Any], thresholds: Dict[str, Any]) -> List[str]:
+    failures = []
+    suite = results["suite"]
+    calibrated = thresholds.get("calibrated_for", {})
+    if any(results["meta"].get(key) != value for key, value in calibrated.items()):
+        print(
+            f"warning: {suite} ran with {results['meta'].get('db')}/{results['meta'].get('contacts')} "
+            f"contacts, thresholds are calibrated for {calibrated}",
+            file=sys.stderr,
+        )
+    for case, limits in thresholds.get(suite, {}).items():
+        stats = results["cases"].get(case)
+        if stats is None:
+            continue
+        if stats.get("errors"):
+            failures.append(f"{suite}.{case}: {stats['errors']} failed requests")
+        for metric, bounds in limits.items():
+            value = stats[metric]
+            if "max" in bounds and value > bounds["max"]:
+                failures.append(f"{suite}.{case}.{metric} = {value:.2f} > {bounds['max']}")
+            if "min" in bounds and value < bounds["min"]:
+                failures.append(f"{suite}.{case}.{metric} = {value:.2f} < {bounds['min']}")
+    return failures
+
+
+def check_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    failures = []
+    suite = results["suite"]
+    for case, stats in results["cases"].items():
+        previous = baseline["cases"].get(case)
+        if previous is None:
+            continue
+        for metric in LOWER_IS_BETTER:
+            if previous[metric] and stats[metric] > previous[metric] * (1 + tolerance):
+                failures.append(
+                    f"{suite}.{case}.{metric} = {stats[metric]:.2f}, baseline {previous[metric]:.2f}"
+                )
+        for metric in HIGHER_IS_BETTER:
+            if stats[metric] < previous[metric] * (1 - tolerance):
+                failures.append(
+                    f"{suite}.{case}.{metric} = {stats[metric]:.2f}, baseline {previous[metric]:.2f}"
+                )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("results", nargs="+", help="result files written with --json")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="absolute limits per case")
+    parser.add_argument("--baseline", nargs="*", default=[], help="result files of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative change vs. baseline")
+    args = parser.parse_args()
+
+    thresholds = _load(args.thresholds)
+    baselines = {document["suite"]: document for document in map(_load, args.baseline)}
+    failures = []
+    for path in args.results:
+        results = _load(path)
+        failures += check_thresholds(results, thresholds)
+        if results["suite"] in baselines:
+            failures += check_baseline(results, baselines[results["suite"]], args.tolerance)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"OK: {len(args.results)} result file(s) within limits.")
+
+
+if __name__ == "__main__":
+    main()
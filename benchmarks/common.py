@@ -0,0 +1,207 @@
+"""
+Helpers shared by the benchmark scripts: database setup, synthetic data,
+latency statistics and result files.
+
+Every script takes ``--db-url``; it defaults to SQLite so that nothing but the
+project dependencies is needed. The database the URL points at is a scratch
+database: its ``contacts`` table is dropped and re-seeded.
+"""
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+os.environ.setdefault("DB_URL", "sqlite+aiosqlite://")
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import Base
+from src.repository import contacts as repository_contacts
+from src.schemas import ContactCreate
+
+FIRST_NAMES = (
+    "Olena", "Taras", "Iryna", "Andrii", "Maria", "Dmytro", "Sofia", "Oleh",
+    "Anna", "Yurii", "Kateryna", "Bohdan", "Nataliia", "Serhii", "Daria", "Pavlo",
+)
+LAST_NAMES = (
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko", "Melnyk",
+    "Oliinyk", "Shevchuk", "Polishchuk", "Lysenko", "Boiko", "Marchenko",
+)
+SEED_CHUNK_SIZE = 1000
+
+
+def add_database_arguments(parser, default_contacts: int = 10_000) -> None:
+    parser.add_argument(
+        "--db-url",
+        default="sqlite+aiosqlite://",
+        help="scratch database to run against (its contacts table is recreated)",
+    )
+    parser.add_argument("--contacts", type=int, default=default_contacts, help="contacts to seed")
+    parser.add_argument("--seed", type=int, default=42, help="random seed of the synthetic data")
+
+
+def create_engine(url: str) -> AsyncEngine:
+    """
+    Creates an engine for a benchmark run; in-memory SQLite shares one connection.
+    """
+    backend = make_url(url)
+    if backend.get_backend_name() == "sqlite" and backend.database in (None, "", ":memory:"):
+        return create_async_engine(url, poolclass=StaticPool)
+    return create_async_engine(url)
+
+
+def synthetic_contact(index: int, rng: random.Random) -> ContactCreate:
+    """
+    Returns the ``index``-th synthetic contact.
+
+    Emails and phones are derived from ``index`` so they are unique; names and
+    birthdays are drawn from ``rng``, so a given seed always yields the same data.
+    """
+    first_name = rng.choice(FIRST_NAMES)
+    last_name = rng.choice(LAST_NAMES)
+    return ContactCreate(
+        first_name=first_name,
+        last_name=last_name,
+        email=f"{first_name}.{last_name}.{index}@example.com".lower(),
+        phone=f"+380{index:09d}",
+        birthday=date(1950, 1, 1) + timedelta(days=rng.randrange(365 * 55)),
+        additional_data=f"note {index}" if rng.random() < 0.3 else None,
+    )
+
+
+def synthetic_contacts(start: int, count: int, seed: int) -> Iterator[ContactCreate]:
+    rng = random.Random(f"{seed}:{start}")
+    for index in range(start, start + count):
+        yield synthetic_contact(index, rng)
+
+
+async def reset_schema(engine: AsyncEngine) -> None:
+    """
+    Drops and recreates every table of the models: contacts, their tombstones
+    and the change-feed counter, so the feed starts over too.
+
+    On PostgreSQL the pg_trgm extension the search indexes need is created
+    first, as the migrations do.
+    """
+    async with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+
+async def seed_contacts(engine: AsyncEngine, count: int, seed: int = 42) -> int:
+    """
+    Recreates the schema (see :func:`reset_schema`) and inserts ``count`` synthetic contacts.
+
+    Rows go through :func:`repository_contacts.bulk_insert_contacts`, so derived
+    columns are filled in exactly like in the application. On a fresh table the
+    contact with ID ``n`` is ``synthetic_contact(n - 1, ...)``.
+
+    :return: The number of contacts inserted.
+    """
+    await reset_schema(engine)
+    inserted = 0
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        for start in range(0, count, SEED_CHUNK_SIZE):
+            bodies = list(synthetic_contacts(start, min(SEED_CHUNK_SIZE, count - start), seed))
+            inserted += len(await repository_contacts.bulk_insert_contacts(bodies, db))
+            await db.commit()
+    return inserted
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: Sequence[float], elapsed: Optional[float] = None, errors: int = 0) -> Dict[str, Any]:
+    """
+    Summarizes latency samples (in seconds) in milliseconds.
+
+    :param samples: One duration per operation.
+    :param elapsed: Wall time of the whole run, for throughput under concurrency;
+        defaults to the sum of the samples.
+    :param errors: Operations that failed; they are not part of the samples.
+    """
+    ordered = sorted(samples)
+    total = elapsed if elapsed is not None else sum(ordered)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "ops_per_sec": len(ordered) / total if total else 0.0,
+    }
+
+
+def result_document(suite: str, args, cases: Dict[str, Dict[str, Any]], **meta: Any) -> Dict[str, Any]:
+    return {
+        "suite": suite,
+        "meta": {
+            "db": make_url(args.db_url).get_backend_name(),
+            "contacts": args.contacts,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **meta,
+        },
+        "cases": cases,
+    }
+
+
+def write_results(document: Dict[str, Any], path: Optional[str]) -> None:
+    """
+    Writes the results as JSON to ``path`` (``-`` for stdout), or prints a table.
+    """
+    if path:
+        text = json.dumps(document, indent=2)
+        if path == "-":
+            print(text)
+        else:
+            with open(path, "w", encoding="utf-8") as output:
+                output.write(text + "\n")
+        return
+    print_table(document)
+
+
+def print_table(document: Dict[str, Any]) -> None:
+    meta = document["meta"]
+    print(f"{document['suite']}: {meta['contacts']} contacts on {meta['db']}", file=sys.stderr)
+    columns: List[str] = ["count", "errors", "p50_ms", "p95_ms", "p99_ms", "ops_per_sec"]
+    width = max(len(name) for name in document["cases"]) + 2
+    print(f"{'case':<{width}}" + "".join(f"{name:>13}" for name in columns))
+    for name, stats in document["cases"].items():
+        cells = "".join(
+            f"{stats[column]:>13}" if isinstance(stats[column], int) else f"{stats[column]:>13.2f}"
+            for column in columns
+        )
+        print(f"{name:<{width}}{cells}")
+
+
+class Timer:
+    """Collects the duration of each ``with`` block."""
+    def __init__(self):
+        self.samples: List[float] = []
+
+    def __enter__(self) -> "Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.samples.append(time.perf_counter() - self._started)
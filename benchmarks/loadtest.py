@@ -0,0 +1,191 @@
+"""
+In-process load generator for the contacts API.
+
+Requests are sent straight to the ASGI application, without a server or a
+network, by ``--concurrency`` concurrent workers. Each scenario (one endpoint)
+runs on its own and reports p50/p95/p99 latency and requests per second:
+
+    python -m benchmarks.loadtest --contacts 10000 --requests 2000 --concurrency 16
+    python -m benchmarks.loadtest --scenarios get list --json results/load.json
+
+Application settings (cache, pool size, ...) are read from the environment as
+usual; ``DB_URL`` is replaced by ``--db-url``, a file database by default.
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import random
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from benchmarks.common import (
+    FIRST_NAMES,
+    add_database_arguments,
+    create_engine,
+    result_document,
+    seed_contacts,
+    summarize,
+    synthetic_contact,
+    write_results,
+)
+from src.conf.config import settings
+from src.core.encoding import dumps
+
+# (method, path, query parameters, JSON body)
+Request = Tuple[str, str, Dict[str, Any], Optional[dict]]
+
+SCENARIOS = ("list", "list_fields", "get", "search", "birthdays", "create", "update")
+
+
+async def asgi_request(app, method: str, path: str, query: Dict[str, Any], body: Optional[dict]) -> int:
+    """
+    Sends one HTTP request to an ASGI application and returns the response status.
+
+    The response body is received and dropped.
+    """
+    payload = dumps(body) if body is not None else b""
+    headers = [(b"host", b"loadtest")]
+    if body is not None:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query).encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("loadtest", 80),
+    }
+    request_sent = False
+    response_done = asyncio.Event()
+    status = 0
+
+    async def receive() -> dict:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_done.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+def build_scenarios(args, stored: Dict[int, Any]) -> Dict[str, Callable[[random.Random], Request]]:
+    next_index = args.contacts
+
+    def contact_id(rng: random.Random) -> int:
+        return rng.randint(1, args.contacts)
+
+    def create(rng: random.Random) -> Request:
+        nonlocal next_index
+        body = synthetic_contact(next_index, rng).model_dump(mode="json")
+        next_index += 1
+        return "POST", "/api/contacts/", {}, body
+
+    def update(rng: random.Random) -> Request:
+        current = stored[contact_id(rng)]
+        body = {**current, "first_name": rng.choice(FIRST_NAMES)}
+        return "PUT", f"/api/contacts/{current['id']}", {}, {k: v for k, v in body.items() if k != "id"}
+
+    return {
+        "list": lambda rng: ("GET", "/api/contacts/", {"limit": 20}, None),
+        "list_fields": lambda rng: ("GET", "/api/contacts/", {"limit": 20, "fields": "first_name,email"}, None),
+        "get": lambda rng: ("GET", f"/api/contacts/{contact_id(rng)}", {}, None),
+        "search": lambda rng: ("GET", "/api/contacts/search/", {"query": rng.choice(FIRST_NAMES)[:4]}, None),
+        "birthdays": lambda rng: ("GET", "/api/contacts/birthdays/", {"days": 7}, None),
+        "create": create,
+        "update": update,
+    }
+
+
+async def run_scenario(app, make_request: Callable[[random.Random], Request], args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    samples: List[float] = []
+    errors = 0
+    remaining = args.requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, path, query, body = make_request(rng)
+            started = time.perf_counter()
+            status = await asgi_request(app, method, path, query, body)
+            if status >= 400:
+                errors += 1
+            else:
+                samples.append(time.perf_counter() - started)
+
+    # Warm-up: the first requests compile statements and fill the pool.
+    for _ in range(min(args.requests, 20)):
+        await asgi_request(app, *make_request(rng))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return summarize(samples, elapsed=time.perf_counter() - started, errors=errors)
+
+
+async def run(args) -> Dict[str, Any]:
+    engine = create_engine(args.db_url)
+    await seed_contacts(engine, args.contacts, args.seed)
+    async with engine.connect() as connection:
+        result = await connection.exec_driver_sql(
+            "SELECT id, first_name, last_name, email, phone, birthday, additional_data FROM contacts"
+        )
+        stored = {row.id: {**row._asdict(), "birthday": str(row.birthday)} for row in result}
+    await engine.dispose()
+
+    # The session manager takes DB_URL when `main` first imports src.database.db;
+    # the engine itself is only created at startup. Set it before that import.
+    settings.DB_URL = args.db_url
+    app = importlib.import_module("main").app
+    logging.getLogger().setLevel(args.log_level)
+
+    scenarios = build_scenarios(args, stored)
+    cases = {}
+    for name in args.scenarios or scenarios:
+        cases[name] = await run_scenario(app, scenarios[name], args)
+    return result_document(
+        "load", args, cases, requests=args.requests, concurrency=args.concurrency
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_database_arguments(parser)
+    parser.set_defaults(
+        db_url=f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'contacts-loadtest.sqlite')}"
+    )
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent in-flight requests")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        help="scenarios to run (all by default)",
+    )
+    parser.add_argument("--log-level", default="WARNING", help="application log level during the run")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON (`-` for stdout)")
+    args = parser.parse_args()
+    write_results(asyncio.run(run(args)), args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,156 @@
-from src.api.contacts import router as contacts_router
-from fastapi import FastAPI
-from src.core.logger import setup_logging
+import contextlib
 
-setup_logging()
+from src.api.contacts import admission, contact_loader, router as contacts_router
+from fastapi import APIRouter, FastAPI, Response, status
+from src.conf.config import settings
+from src.core.compression import CompressionMiddleware
+from src.core.logger import RequestLogContextMiddleware, get_logger, logging_stats, setup_logging, shutdown_logging
+from src.core.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics, stats_gauges
+from src.database.db import sessionmanager
+from src.repository.backends import memory_repository, preload_memory_repository, uses_database
+from src.repository.cache import contact_cache, contact_count_cache
+from src.repository.contacts import prime_statements, statement_cache_stats
 
-app = FastAPI(
-    title="Contacts REST API",
-    version="1.0.0",
-    description="API для зберігання та управління контактами (FastAPI + SQLAlchemy + PostgreSQL).",
-)
+logger = get_logger(__name__)
 
-app.include_router(contacts_router, prefix="/api", tags=["contacts"])
+router = APIRouter()
 
-@app.get("/")
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates and warms up the database engines on startup; on shutdown, waits
+    for open sessions to finish, then disposes of the engines.
+
+    With the `memory` backend the database is only used to preload the
+    contacts when `CONTACTS_MEMORY_PRELOAD` is set.
+    """
+    setup_logging()
+    if uses_database():
+        sessionmanager.init()
+        try:
+            await sessionmanager.warm_up(settings.DB_POOL_WARMUP_CONNECTIONS, prime_statements)
+        except Exception:
+            # Serve anyway; readiness reports the database as unavailable until it is back.
+            logger.exception("Database warm-up failed.")
+    elif settings.CONTACTS_MEMORY_PRELOAD:
+        loaded = await preload_memory_repository(settings.EXPORT_BATCH_SIZE)
+        logger.info("Preloaded %s contacts into memory.", loaded)
+    yield
+    await sessionmanager.drain(settings.DB_DRAIN_TIMEOUT_SECONDS)
+    await sessionmanager.close()
+    shutdown_logging()
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the application. Nothing connects to the database until startup.
+    """
+    app = FastAPI(
+        title="Contacts REST API",
+        version="1.0.0",
+        description="API для зберігання та управління контактами (FastAPI + SQLAlchemy + PostgreSQL).",
+        lifespan=lifespan,
+    )
+    app.include_router(contacts_router, prefix="/api", tags=["contacts"])
+    app.include_router(router)
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            preference=settings.COMPRESSION_ENCODINGS,
+            levels=settings.COMPRESSION_LEVELS,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        )
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(RequestLogContextMiddleware)
+    return app
+
+
+@router.get("/")
 def health_check():
     return {"status": "ok"}
+
+
+@router.get("/health/live")
+def liveness():
+    """
+    Liveness probe: the process is up and serving requests.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def readiness(response: Response):
+    """
+    Readiness probe: the app is not shutting down and a pooled database
+    connection can be checked out and used within `DB_HEALTH_TIMEOUT_SECONDS`.
+
+    Answers 503 otherwise, so the load balancer stops routing here. Pool
+    saturation is included to tell a slow database from an exhausted pool.
+    With the `memory` backend the database is not checked and reported as null.
+    """
+    database = await sessionmanager.ping(settings.DB_HEALTH_TIMEOUT_SECONDS) if uses_database() else None
+    ready = (database or not uses_database()) and not sessionmanager.draining
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if ready else "unavailable",
+        "database": database,
+        "draining": sessionmanager.draining,
+        "pool": sessionmanager.pool_status(),
+    }
+
+
+@router.get("/stats/cache")
+def cache_stats():
+    """
+    Returns the contact cache counters (hits, misses, evictions, expirations).
+    """
+    return contact_cache.stats()
+
+
+@router.get("/stats/pool")
+def pool_stats():
+    """
+    Returns checkout wait times and saturation of the database connection pools.
+    """
+    return sessionmanager.pool_status()
+
+
+@router.get("/stats/admission")
+def admission_stats():
+    """
+    Returns in-flight and queued requests, admissions and rejections per route class.
+    """
+    return admission.stats()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Exposes request, SQL, pool and cache metrics in the Prometheus text format.
+    """
+    pools = sessionmanager.pool_status()
+    pool_rows = [({"engine": "primary"}, pools["primary"])] + [
+        ({"engine": f"replica{index}"}, pool) for index, pool in enumerate(pools["replicas"])
+    ]
+    content = render_metrics(
+        stats_gauges("db_pool", "/stats/pool", pool_rows),
+        stats_gauges(
+            "admission",
+            "/stats/admission",
+            [({"class": name}, stats) for name, stats in admission.stats().items()],
+        ),
+        stats_gauges("contact_cache", "/stats/cache", [({}, contact_cache.stats())]),
+        stats_gauges("contact_count_cache", "the total-count cache", [({}, contact_count_cache.stats())]),
+        stats_gauges("contact_loader", "the get-by-ID coalescer", [({}, contact_loader.stats())]),
+        stats_gauges("logging_records", "the logging queue", [({}, logging_stats())]),
+        stats_gauges(
+            "memory_repository", "the memory backend", [({}, memory_repository.stats())] if not uses_database() else []
+        ),
+        stats_gauges("repository_statement_shapes", "the prebuilt read statements", [({}, statement_cache_stats())]),
+    )
+    return Response(content=content, media_type=CONTENT_TYPE)
+
+
+app = create_app()
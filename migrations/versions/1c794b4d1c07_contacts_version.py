@@ -0,0 +1,34 @@
+"""contacts version and updated_at
+
+Revision ID: 1c794b4d1c07
+Revises: 6f60be5c2df8
+Create Date: 2026-10-17 11:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c794b4d1c07'
+down_revision: Union[str, Sequence[str], None] = '6f60be5c2df8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        batch_op.add_column(
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('version')
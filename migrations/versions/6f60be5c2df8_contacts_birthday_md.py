@@ -0,0 +1,44 @@
+"""contacts birthday month-day key
+
+Revision ID: 6f60be5c2df8
+Revises: e6cbe35045a2
+Create Date: 2026-10-17 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f60be5c2df8'
+down_revision: Union[str, Sequence[str], None] = 'e6cbe35045a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column('birthday_md', sa.SmallInteger(), nullable=True))
+    contacts = sa.table('contacts', sa.column('birthday', sa.Date), sa.column('birthday_md', sa.SmallInteger))
+    op.execute(
+        contacts.update().values(
+            birthday_md=sa.cast(
+                sa.extract('month', contacts.c.birthday) * 100 + sa.extract('day', contacts.c.birthday),
+                sa.SmallInteger,
+            )
+        )
+    )
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.alter_column('birthday_md', existing_type=sa.SmallInteger(), nullable=False)
+    op.create_index(
+        'ix_contacts_birthday_md', 'contacts', ['birthday_md', 'last_name', 'first_name', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_birthday_md', table_name='contacts')
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.drop_column('birthday_md')
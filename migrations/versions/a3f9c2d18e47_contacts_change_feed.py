@@ -0,0 +1,72 @@
+"""contacts change sequence and tombstones
+
+Revision ID: a3f9c2d18e47
+Revises: 1c794b4d1c07
+Create Date: 2026-10-17 14:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.schema import CreateSequence, DropSequence
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f9c2d18e47'
+down_revision: Union[str, Sequence[str], None] = '1c794b4d1c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGE_SEQ = sa.Sequence('contacts_change_seq')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    op.create_table(
+        'contact_tombstones',
+        sa.Column('contact_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('contact_id'),
+    )
+    op.create_index(
+        op.f('ix_contact_tombstones_change_seq'), 'contact_tombstones', ['change_seq'], unique=False
+    )
+    op.create_table(
+        'change_counters',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    if is_postgresql:
+        op.execute(CreateSequence(CHANGE_SEQ))
+
+    # Existing contacts enter the change feed in ID order.
+    op.add_column('contacts', sa.Column('change_seq', sa.BigInteger(), nullable=True))
+    op.execute('UPDATE contacts SET change_seq = id')
+    if is_postgresql:
+        op.execute(
+            "SELECT setval('contacts_change_seq', (SELECT coalesce(max(id), 0) + 1 FROM contacts), false)"
+        )
+    else:
+        op.execute(
+            "INSERT INTO change_counters (name, value) "
+            "SELECT 'contacts_change_seq', coalesce(max(id), 0) FROM contacts"
+        )
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.alter_column('change_seq', existing_type=sa.BigInteger(), nullable=False)
+    op.create_index(op.f('ix_contacts_change_seq'), 'contacts', ['change_seq'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_contacts_change_seq'), table_name='contacts')
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.drop_column('change_seq')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(DropSequence(CHANGE_SEQ))
+    op.drop_table('change_counters')
+    op.drop_index(op.f('ix_contact_tombstones_change_seq'), table_name='contact_tombstones')
+    op.drop_table('contact_tombstones')
@@ -0,0 +1,92 @@
+"""contacts normalized duplicate-detection keys
+
+Revision ID: b7d41e6a9c05
+Revises: a3f9c2d18e47
+Create Date: 2026-10-17 16:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.models import email_key, name_key, phone_key
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41e6a9c05'
+down_revision: Union[str, Sequence[str], None] = 'a3f9c2d18e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEY_COLUMNS = (
+    ('email_key', 255),
+    ('phone_key', 50),
+    ('first_name_key', 100),
+    ('last_name_key', 100),
+)
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, length in KEY_COLUMNS:
+        op.add_column('contacts', sa.Column(name, sa.String(length=length), nullable=True))
+
+    # The keys are normalized in Python (Unicode folding has no portable SQL),
+    # with the same functions the application uses.
+    contacts = sa.table(
+        'contacts',
+        sa.column('id', sa.Integer),
+        sa.column('email', sa.String),
+        sa.column('phone', sa.String),
+        sa.column('first_name', sa.String),
+        sa.column('last_name', sa.String),
+        *(sa.column(name, sa.String) for name, _ in KEY_COLUMNS),
+    )
+    bind = op.get_bind()
+    fill = (
+        contacts.update()
+        .where(contacts.c.id == sa.bindparam('contact_id'))
+        .values({name: sa.bindparam(name) for name, _ in KEY_COLUMNS})
+    )
+    after = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                contacts.c.id, contacts.c.email, contacts.c.phone, contacts.c.first_name, contacts.c.last_name
+            )
+            .where(contacts.c.id > after)
+            .order_by(contacts.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(fill, [
+            {
+                'contact_id': row.id,
+                'email_key': email_key(row.email),
+                'phone_key': phone_key(row.phone),
+                'first_name_key': name_key(row.first_name),
+                'last_name_key': name_key(row.last_name),
+            }
+            for row in rows
+        ])
+        after = rows[-1].id
+
+    with op.batch_alter_table('contacts') as batch_op:
+        for name, length in KEY_COLUMNS:
+            batch_op.alter_column(name, existing_type=sa.String(length=length), nullable=False)
+    op.create_index('ix_contacts_email_key', 'contacts', ['email_key', 'id'], unique=False)
+    op.create_index('ix_contacts_phone_key', 'contacts', ['phone_key', 'id'], unique=False)
+    op.create_index('ix_contacts_name_key', 'contacts', ['last_name_key', 'first_name_key', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_name_key', table_name='contacts')
+    op.drop_index('ix_contacts_phone_key', table_name='contacts')
+    op.drop_index('ix_contacts_email_key', table_name='contacts')
+    with op.batch_alter_table('contacts') as batch_op:
+        for name, _ in KEY_COLUMNS:
+            batch_op.drop_column(name)
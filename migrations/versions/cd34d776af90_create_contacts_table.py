@@ -0,0 +1,47 @@
+"""create contacts table
+
+Revision ID: cd34d776af90
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cd34d776af90'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'contacts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('first_name', sa.String(length=50), nullable=False),
+        sa.Column('last_name', sa.String(length=50), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('phone', sa.String(length=50), nullable=False),
+        sa.Column('birthday', sa.Date(), nullable=False),
+        sa.Column('additional_data', sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('phone'),
+    )
+    op.create_index(op.f('ix_contacts_birthday'), 'contacts', ['birthday'], unique=False)
+    op.create_index(op.f('ix_contacts_email'), 'contacts', ['email'], unique=True)
+    op.create_index(op.f('ix_contacts_first_name'), 'contacts', ['first_name'], unique=False)
+    op.create_index(op.f('ix_contacts_last_name'), 'contacts', ['last_name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_contacts_last_name'), table_name='contacts')
+    op.drop_index(op.f('ix_contacts_first_name'), table_name='contacts')
+    op.drop_index(op.f('ix_contacts_email'), table_name='contacts')
+    op.drop_index(op.f('ix_contacts_birthday'), table_name='contacts')
+    op.drop_table('contacts')
@@ -0,0 +1,57 @@
+"""contacts search indexes
+
+Revision ID: e6cbe35045a2
+Revises: cd34d776af90
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6cbe35045a2'
+down_revision: Union[str, Sequence[str], None] = 'cd34d776af90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ('first_name', 'last_name', 'email')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The indexes are PostgreSQL-specific; other databases keep using the plain
+    # b-tree indexes and the repository falls back to LIKE scans.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY keeps the table writable while large indexes are built, but it
+    # cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.create_index(
+                f'ix_contacts_{column}_trgm',
+                'contacts',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+            op.create_index(
+                f'ix_contacts_{column}_prefix',
+                'contacts',
+                [sa.text(f'lower({column}) text_pattern_ops')],
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.drop_index(f'ix_contacts_{column}_prefix', table_name='contacts', postgresql_concurrently=True)
+            op.drop_index(f'ix_contacts_{column}_trgm', table_name='contacts', postgresql_concurrently=True)
@@ -1,131 +1,751 @@
 # src/api/contacts.py
 
-from typing import List, Optional
+import contextlib
+import csv
+import io
+from typing import Any, AsyncIterator, List, Mapping, Optional, Sequence, Tuple, Union
 
-from fastapi import APIRouter, HTTPException, Depends, status, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Header, HTTPException, Depends, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
-from src.database.db import get_db
+from src.conf.config import settings
+from src.database.db import sessionmanager
 from src.repository import contacts as repository_contacts
-from src.schemas import ContactCreate, ContactUpdate, ContactResponse
+from src.repository.backends import contact_loader as create_contact_loader
+from src.repository.backends import get_read_repository, get_repository, repository_session
+from src.repository.base import ContactRepository
+from src.repository.contacts import BulkLimitError, ContactConflictError, StaleContactError
+from src.repository.pagination import InvalidCursorError, Page
+from src.schemas import (
+    BulkChangeReport,
+    BulkImportReport,
+    BulkImportRowError,
+    ContactBatchRequest,
+    ContactBulkSelection,
+    ContactBulkUpdateRequest,
+    ContactChangeFeed,
+    ContactChangeResponse,
+    ContactCreate,
+    ContactDuplicateGroup,
+    ContactUpdate,
+    ContactResponse,
+)
+from src.core.admission import AdmissionController, AdmissionRejected, RouteClass
+from src.core.encoding import dumps
+from src.core.etags import contact_etag, digest_etag, expected_versions, none_match
 from src.core.logger import get_logger
+from src.core.records import iter_csv_records, iter_ndjson_records
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+# Merges concurrent `GET /contacts/{contact_id}` lookups into one query.
+contact_loader = create_contact_loader()
 
-@router.get("/search/", response_model=List[ContactResponse])
+# Sheds load before it reaches the database pool; routes declare their class
+# with `admit(...)`.
+admission = AdmissionController(
+    {name: RouteClass(**limits.model_dump()) for name, limits in settings.ADMISSION_CLASSES.items()},
+    capacity=settings.ADMISSION_CAPACITY or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    saturated=sessionmanager.pool_saturated,
+)
+
+
+@contextlib.asynccontextmanager
+async def _admission_slot(route_class: str) -> AsyncIterator[None]:
+    """
+    Holds a slot of ``route_class`` (see `ADMISSION_CLASSES`) for the block.
+
+    Rejected requests get a 503 with `Retry-After` right away.
+    """
+    if not settings.ADMISSION_ENABLED:
+        yield
+        return
+    try:
+        await admission.acquire(route_class)
+    except AdmissionRejected as exc:
+        logger.warning("Rejected a %s request: %s.", route_class, exc.reason)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The server is busy, retry later.",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+    try:
+        yield
+    finally:
+        admission.release(route_class)
+
+
+def admit(route_class: str):
+    """
+    Returns a route dependency holding a slot of ``route_class`` while the
+    request is handled (see :func:`_admission_slot`).
+
+    Route dependencies exit before a streamed body is sent; streaming routes
+    hold their slot in the body instead.
+    """
+    async def admission_slot():
+        async with _admission_slot(route_class):
+            yield
+
+    return Depends(admission_slot)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_MODE_HEADER = "X-Total-Count-Mode"
+
+SKIP_QUERY = Query(
+    0,
+    ge=0,
+    deprecated=True,
+    description="Offset pagination, kept for backward compatibility. Use `cursor` instead.",
+)
+CURSOR_QUERY = Query(
+    None,
+    description=f"Opaque cursor taken from the `{NEXT_CURSOR_HEADER}` header of the previous page.",
+)
+
+
+COUNT_QUERY = Query(
+    None,
+    pattern=f"^({'|'.join(repository_contacts.COUNT_MODES)})$",
+    description=(
+        f"Return the total number of matches in `{TOTAL_COUNT_HEADER}`: `estimate` (planner statistics), "
+        f"`cached` (exact, cached until the next write) or `exact` (`COUNT(*)` on every call). "
+        f"`{TOTAL_COUNT_MODE_HEADER}` tells which one was used."
+    ),
+)
+
+
+def _check_pagination(skip: int, cursor: Optional[str]) -> None:
+    if cursor is not None and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either `skip` or `cursor`, not both.",
+        )
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+    )
+
+
+def _conflict(exc: ContactConflictError) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+
+IF_NONE_MATCH_HEADER = Header(
+    None, description="ETag of a cached representation; answered with 304 when still current."
+)
+IF_MATCH_HEADER = Header(
+    None, description="ETag the contact must still have for the write to apply; 412 otherwise."
+)
+
+
+def _precondition_failed(exc: StaleContactError) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(exc))
+
+
+def _not_modified(etag: str, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **(headers or {})})
+
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated fields to return, e.g. `first_name,email`. All fields by default.",
+)
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Validates a sparse fieldset and returns it in response order.
+    """
+    if not fields:
+        return list(repository_contacts.FIELD_COLUMNS)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(repository_contacts.FIELD_COLUMNS)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}." if unknown else "No fields requested.",
+        )
+    return [name for name in repository_contacts.FIELD_COLUMNS if name in requested]
+
+
+def _page_response(
+    page: Page,
+    fields: Sequence[str],
+    if_none_match: Optional[str] = None,
+    total: Optional[Tuple[int, str]] = None,
+) -> Response:
+    """
+    Serializes a page of field dictionaries straight to JSON.
+
+    The rows come from our own database, so the per-row `ContactResponse`
+    validation FastAPI would run on ORM objects is skipped. The ETag is derived
+    from the versions of the contacts on the page, and from the total when one
+    was requested, so a matching `If-None-Match` is answered with 304 before
+    anything is serialized. The 304 still carries the count headers.
+    """
+    count_headers = {}
+    if total is not None:
+        count_headers = {TOTAL_COUNT_HEADER: str(total[0]), TOTAL_COUNT_MODE_HEADER: total[1]}
+    etag = digest_etag(page.version_tag, ",".join(fields), page.next_cursor, *(total or ()))
+    if none_match(if_none_match, etag):
+        return _not_modified(etag, count_headers)
+    response = Response(content=dumps(page.items), media_type="application/json", headers=count_headers)
+    response.headers["ETag"] = etag
+    if page.next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return response
+
+
+@router.get("/search/", response_model=List[ContactResponse], dependencies=[admit("search")])
 async def search_contacts(
     query: str = Query(..., min_length=1),
-    skip: int = 0,
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db),
+    skip: int = SKIP_QUERY,
+    limit: int = Query(10, ge=1),
+    cursor: Optional[str] = CURSOR_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    count: Optional[str] = COUNT_QUERY,
+    if_none_match: Optional[str] = IF_NONE_MATCH_HEADER,
+    repository: ContactRepository = Depends(get_read_repository),
 ):
     """
     Searches for contacts by first name, last name, or email.
+
+    The cursor of the next page, if any, is returned in the `X-Next-Cursor` header.
+    With `count`, the total number of matches is returned in `X-Total-Count`.
     """
-    logger.info(f"Searching for contacts with query: '{query}'")
-    contacts = await repository_contacts.search_contacts(query, skip, limit, db)
-    return contacts
+    logger.info("Searching for contacts with query: '%s'", query)
+    _check_pagination(skip, cursor)
+    selected = _parse_fields(fields)
+    try:
+        page = await repository.search_contacts(query, skip, limit, cursor=cursor, fields=selected)
+    except InvalidCursorError:
+        raise _invalid_cursor()
+    total = await repository.count_contacts(query=query, mode=count) if count else None
+    return _page_response(page, selected, if_none_match, total)
 
 
-@router.get("/birthdays/", response_model=List[ContactResponse])
-async def get_upcoming_birthdays(db: AsyncSession = Depends(get_db)):
+@router.get("/birthdays/", response_model=List[ContactResponse], dependencies=[admit("read")])
+async def get_upcoming_birthdays(
+    days: int = Query(7, ge=0, le=365, description="Size of the window in days."),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = CURSOR_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    if_none_match: Optional[str] = IF_NONE_MATCH_HEADER,
+    repository: ContactRepository = Depends(get_read_repository),
+):
     """
-    Retrieves contacts with birthdays in the next 7 days.
+    Retrieves contacts with birthdays in the next `days` days (7 by default).
+
+    The cursor of the next page, if any, is returned in the `X-Next-Cursor` header.
     """
-    logger.info("Fetching upcoming birthdays.")
-    contacts = await repository_contacts.get_upcoming_birthdays(db)
-    return contacts
+    logger.info("Fetching upcoming birthdays for %s days.", days)
+    selected = _parse_fields(fields)
+    try:
+        page = await repository.get_upcoming_birthdays(days=days, limit=limit, cursor=cursor, fields=selected)
+    except InvalidCursorError:
+        raise _invalid_cursor()
+    return _page_response(page, selected, if_none_match)
+
 
-@router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
-async def create_contact(body: ContactCreate, db: AsyncSession = Depends(get_db)):
+def _parse_ids(ids: str) -> List[int]:
+    try:
+        return [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="`ids` must be a comma-separated list of integers.",
+        )
+
+
+async def _batch_response(
+    contact_ids: List[int], fields: Optional[str], if_none_match: Optional[str], repository: ContactRepository
+) -> Response:
     """
-    Creates a new contact.
+    Looks up many contacts with one query and returns them in request order.
+
+    IDs that were not found are listed in the `X-Missing-Ids` header.
     """
-    logger.info(f"Creating a new contact for email: {body.email}")
-    existing_contact = await repository_contacts.get_contact_by_email(body.email, db)
-    if existing_contact:
-        logger.warning(f"Email {body.email} already exists.")
+    distinct_ids = list(dict.fromkeys(contact_ids))
+    if not distinct_ids or len(distinct_ids) > settings.CONTACT_BATCH_MAX_IDS:
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Contact with this email already exists.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Pass between 1 and {settings.CONTACT_BATCH_MAX_IDS} distinct IDs.",
+        )
+    selected = _parse_fields(fields)
+    logger.info("Fetching %s contacts by ID.", len(distinct_ids))
+    contacts = await repository.get_contacts_by_ids(distinct_ids)
+
+    etag = digest_etag(",".join(f"{contact.id}.{contact.version}" for contact in contacts), ",".join(selected))
+    if none_match(if_none_match, etag):
+        return _not_modified(etag)
+    items = [{name: getattr(contact, name) for name in selected} for contact in contacts]
+    response = Response(content=dumps(items), media_type="application/json")
+    response.headers["ETag"] = etag
+    found = {contact.id for contact in contacts}
+    missing = [str(contact_id) for contact_id in distinct_ids if contact_id not in found]
+    if missing:
+        response.headers["X-Missing-Ids"] = ",".join(missing)
+    return response
+
+
+@router.get("/batch", response_model=List[ContactResponse], dependencies=[admit("lookup")])
+async def get_contacts_batch(
+    ids: str = Query(..., description="Comma-separated contact IDs, e.g. `1,2,3`."),
+    fields: Optional[str] = FIELDS_QUERY,
+    if_none_match: Optional[str] = IF_NONE_MATCH_HEADER,
+    repository: ContactRepository = Depends(get_read_repository),
+):
+    """
+    Retrieves many contacts by ID with a single query.
+
+    Contacts are returned in the order of `ids`; unknown IDs are skipped and
+    listed in the `X-Missing-Ids` header.
+    """
+    return await _batch_response(_parse_ids(ids), fields, if_none_match, repository)
+
+
+@router.post("/batch", response_model=List[ContactResponse], dependencies=[admit("lookup")])
+async def post_contacts_batch(
+    body: ContactBatchRequest,
+    fields: Optional[str] = FIELDS_QUERY,
+    if_none_match: Optional[str] = IF_NONE_MATCH_HEADER,
+    repository: ContactRepository = Depends(get_read_repository),
+):
+    """
+    Same as `GET /batch`, for ID lists too long for a URL.
+    """
+    return await _batch_response(body.ids, fields, if_none_match, repository)
+
+
+@router.get("/changes", response_model=ContactChangeFeed, dependencies=[admit("read")])
+async def get_contact_changes(
+    since: Optional[str] = Query(
+        None, description="The `cursor` of the previous call; omit it to start from the beginning."
+    ),
+    limit: int = Query(100, ge=1, le=1000),
+    repository: ContactRepository = Depends(get_read_repository),
+):
+    """
+    Returns the contacts created, updated or deleted since `since`, oldest first.
+
+    Clients keep the returned `cursor` and call again with it, right away while
+    `has_more` is true. Changes become visible after
+    `CHANGE_FEED_SAFETY_LAG_SECONDS`.
+    """
+    logger.info("Fetching contact changes since %s.", since)
+    try:
+        batch = await repository.get_changes(
+            since=since, limit=limit, safety_lag=settings.CHANGE_FEED_SAFETY_LAG_SECONDS
+        )
+    except InvalidCursorError:
+        raise _invalid_cursor()
+    return ContactChangeFeed(
+        changes=[
+            ContactChangeResponse(
+                op=change.op,
+                id=change.contact_id,
+                contact=ContactResponse.model_validate(change.contact) if change.contact is not None else None,
+            )
+            for change in batch.changes
+        ],
+        cursor=batch.cursor,
+        has_more=batch.has_more,
+    )
+
+
+@router.get("/duplicates", response_model=List[ContactDuplicateGroup], dependencies=[admit("search")])
+async def get_duplicate_contacts(
+    response: Response,
+    by: str = Query(
+        "email",
+        pattern=f"^({'|'.join(repository_contacts.DUPLICATE_KEYS)})$",
+        description="Compare normalized `email`, `phone` (digits only) or `name` (last and first).",
+    ),
+    limit: int = Query(50, ge=1, le=500, description="Groups per page."),
+    cursor: Optional[str] = CURSOR_QUERY,
+    repository: ContactRepository = Depends(get_read_repository),
+):
+    """
+    Finds groups of contacts sharing the same normalized email, phone or name,
+    e.g. emails differing only in case or phones formatted differently.
+
+    The cursor of the next page, if any, is returned in the `X-Next-Cursor` header.
+    """
+    logger.info("Finding duplicate contacts by %s.", by)
+    try:
+        page = await repository.find_duplicates(by=by, limit=limit, cursor=cursor)
+    except InvalidCursorError:
+        raise _invalid_cursor()
+    if page.next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return [
+        ContactDuplicateGroup(
+            key=list(group.key),
+            contacts=[ContactResponse.model_validate(contact) for contact in group.contacts],
         )
-    contact = await repository_contacts.create_contact(body, db)
+        for group in page.items
+    ]
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _encode_ndjson(rows: Sequence[Mapping[str, Any]]) -> bytes:
+    return b"".join(dumps(dict(row)) + b"\n" for row in rows)
+
+
+def _encode_csv(rows: Sequence[Mapping[str, Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(row.values() for row in rows)
+    return buffer.getvalue()
+
+
+async def _export_body(
+    export_format: str, query: Optional[str], days: Optional[int]
+) -> AsyncIterator[Union[str, bytes]]:
+    # Request-scoped dependencies exit before a streamed body is sent, so the
+    # export holds its own "bulk" slot and session for as long as the stream is
+    # consumed. The route takes the empty first chunk itself: the slot is then
+    # held, or the rejection is still answered with a 503.
+    encode = _encode_csv if export_format == "csv" else _encode_ndjson
+    async with _admission_slot("bulk"):
+        yield b""
+        if export_format == "csv":
+            yield _encode_csv([{column.key: column.key for column in repository_contacts.EXPORT_COLUMNS}])
+        async with repository_session(read_only=True) as repository:
+            async for rows in repository.stream_contacts(
+                query=query, days=days, batch_size=settings.EXPORT_BATCH_SIZE
+            ):
+                yield encode(rows)
+
+
+@router.get("/export")
+async def export_contacts(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    query: Optional[str] = Query(None, min_length=1),
+    days: Optional[int] = Query(None, ge=0, le=365, description="Only birthdays in the next `days` days."),
+):
+    """
+    Streams all contacts matching the optional search `query` and birthday window.
+
+    Rows are read from a server-side cursor and sent as they arrive, so memory use
+    stays flat whatever the table size.
+    """
+    logger.info("Exporting contacts as %s (query=%s, days=%s).", export_format, query, days)
+    body = _export_body(export_format, query, days)
+    await body.__anext__()
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{export_format}"'},
+    )
+
+
+@router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED, dependencies=[admit("write")])
+async def create_contact(
+    body: ContactCreate, response: Response, repository: ContactRepository = Depends(get_repository)
+):
+    """
+    Creates a new contact.
+    """
+    logger.info("Creating a new contact for email: %s", body.email)
+    try:
+        contact = await repository.create_contact(body)
+    except ContactConflictError as exc:
+        logger.warning("Email %s or phone %s already exists.", body.email, body.phone)
+        raise _conflict(exc)
+    response.headers["ETag"] = contact_etag(contact.id, contact.version)
     return contact
 
 
-@router.get("/", response_model=List[ContactResponse])
+BULK_IMPORT_PARSERS = {
+    "application/x-ndjson": iter_ndjson_records,
+    "application/jsonl": iter_ndjson_records,
+    "text/csv": iter_csv_records,
+}
+
+
+def _reject_row(report: BulkImportReport, row: int, detail: str) -> None:
+    report.failed += 1
+    if len(report.errors) < settings.BULK_IMPORT_MAX_ERRORS:
+        report.errors.append(BulkImportRowError(row=row, detail=detail))
+    else:
+        report.errors_truncated = True
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+async def _import_chunk(
+    chunk: List[Tuple[int, ContactCreate]], report: BulkImportReport, repository: ContactRepository
+) -> None:
+    """
+    Inserts one chunk of validated rows and records the rows that were rejected.
+
+    The chunk is committed on its own, so rows imported before a later failure
+    are kept.
+    """
+    rows, seen_emails, seen_phones = [], set(), set()
+    for row, body in chunk:
+        if body.email in seen_emails or body.phone in seen_phones:
+            _reject_row(report, row, "Duplicate email or phone within the upload.")
+            continue
+        seen_emails.add(body.email)
+        seen_phones.add(body.phone)
+        rows.append((row, body))
+
+    inserted = await repository.bulk_insert_contacts([body for _, body in rows])
+    await repository.commit()
+    report.inserted += len(inserted)
+    for row, body in rows:
+        if body.email not in inserted:
+            _reject_row(report, row, "Contact with this email or phone already exists.")
+
+
+@router.post("/bulk", response_model=BulkImportReport, dependencies=[admit("bulk")])
+async def bulk_import_contacts(request: Request, repository: ContactRepository = Depends(get_repository)):
+    """
+    Imports contacts from an NDJSON (`application/x-ndjson`) or CSV (`text/csv`) body.
+
+    The body is streamed and validated in chunks of `BULK_IMPORT_CHUNK_SIZE` rows;
+    each chunk is written with a single `INSERT ... ON CONFLICT DO NOTHING`. Rows that
+    fail validation or clash with an existing email or phone are listed in the report.
+    CSV uploads must start with a header row naming the contact fields.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    parse_records = BULK_IMPORT_PARSERS.get(content_type)
+    if parse_records is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Expected one of: {', '.join(BULK_IMPORT_PARSERS)}.",
+        )
+
+    logger.info("Starting bulk import (%s).", content_type)
+    report = BulkImportReport(received=0, inserted=0, failed=0, errors=[])
+    chunk: List[Tuple[int, ContactCreate]] = []
+    async for row, record, error in parse_records(request.stream()):
+        report.received += 1
+        if error is not None:
+            _reject_row(report, row, str(error))
+            continue
+        try:
+            chunk.append((row, ContactCreate.model_validate(record)))
+        except ValidationError as exc:
+            _reject_row(report, row, _format_validation_error(exc))
+            continue
+        if len(chunk) >= settings.BULK_IMPORT_CHUNK_SIZE:
+            await _import_chunk(chunk, report, repository)
+            chunk = []
+    await _import_chunk(chunk, report, repository)
+    logger.info(
+        "Bulk import finished: %s inserted, %s failed.", report.inserted, report.failed
+    )
+    return report
+
+
+def _bulk_selection(body: ContactBulkSelection) -> dict:
+    return {
+        "contact_ids": body.ids,
+        "query": body.filter.query if body.filter is not None else None,
+        "days": body.filter.days if body.filter is not None else None,
+        "max_rows": settings.BULK_CHANGE_MAX_ROWS,
+        "batch_size": settings.BULK_CHANGE_BATCH_SIZE,
+    }
+
+
+def _bulk_report(body: ContactBulkSelection, changed_ids: List[int]) -> BulkChangeReport:
+    return BulkChangeReport(affected=len(changed_ids), ids=changed_ids if body.return_ids else None)
+
+
+def _too_many_rows(exc: BulkLimitError) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.patch("/bulk", response_model=BulkChangeReport, response_model_exclude_none=True, dependencies=[admit("bulk")])
+async def bulk_update_contacts(body: ContactBulkUpdateRequest, repository: ContactRepository = Depends(get_repository)):
+    """
+    Sets the same fields on many contacts, selected by `ids` or by `filter`.
+
+    Rows are updated with set-based `UPDATE` statements of up to
+    `BULK_CHANGE_BATCH_SIZE` rows, all in one transaction. Requests selecting
+    more than `BULK_CHANGE_MAX_ROWS` contacts are rejected without changes.
+    """
+    logger.info("Bulk updating contacts (%s).", "by ID" if body.ids is not None else "by filter")
+    try:
+        changed_ids = await repository.bulk_update_contacts(
+            body.changes, **_bulk_selection(body)
+        )
+    except BulkLimitError as exc:
+        raise _too_many_rows(exc)
+    logger.info("Bulk update changed %s contacts.", len(changed_ids))
+    return _bulk_report(body, changed_ids)
+
+
+@router.delete("/bulk", response_model=BulkChangeReport, response_model_exclude_none=True, dependencies=[admit("bulk")])
+async def bulk_delete_contacts(body: ContactBulkSelection, repository: ContactRepository = Depends(get_repository)):
+    """
+    Deletes many contacts, selected by `ids` or by `filter`, like `PATCH /bulk`.
+    """
+    logger.info("Bulk deleting contacts (%s).", "by ID" if body.ids is not None else "by filter")
+    try:
+        changed_ids = await repository.bulk_remove_contacts(**_bulk_selection(body))
+    except BulkLimitError as exc:
+        raise _too_many_rows(exc)
+    logger.info("Bulk delete removed %s contacts.", len(changed_ids))
+    return _bulk_report(body, changed_ids)
+
+
+@router.get("/", response_model=List[ContactResponse], dependencies=[admit("read")])
 async def get_contacts(
-    skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_db)
+    skip: int = SKIP_QUERY,
+    limit: int = Query(10, ge=1),
+    cursor: Optional[str] = CURSOR_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    count: Optional[str] = COUNT_QUERY,
+    if_none_match: Optional[str] = IF_NONE_MATCH_HEADER,
+    repository: ContactRepository = Depends(get_read_repository),
 ):
     """
     Retrieves a list of contacts with pagination.
+
+    The cursor of the next page, if any, is returned in the `X-Next-Cursor` header.
+    With `count`, the total number of contacts is returned in `X-Total-Count`.
     """
-    logger.info(f"Fetching contacts with skip={skip}, limit={limit}")
-    contacts = await repository_contacts.get_contacts(skip, limit, db)
-    return contacts
+    logger.info("Fetching contacts with skip=%s, limit=%s, cursor=%s", skip, limit, cursor)
+    _check_pagination(skip, cursor)
+    selected = _parse_fields(fields)
+    try:
+        page = await repository.get_contacts(skip, limit, cursor=cursor, fields=selected)
+    except InvalidCursorError:
+        raise _invalid_cursor()
+    total = await repository.count_contacts(mode=count) if count else None
+    return _page_response(page, selected, if_none_match, total)
 
 
-@router.get("/{contact_id}", response_model=ContactResponse)
-async def get_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
+@router.get("/{contact_id}", response_model=ContactResponse, dependencies=[admit("lookup")])
+async def get_contact(
+    contact_id: int,
+    response: Response,
+    if_none_match: Optional[str] = IF_NONE_MATCH_HEADER,
+):
     """
     Retrieves a single contact by its ID.
+
+    Concurrent lookups are merged into one query. Answers 304 when
+    `If-None-Match` holds the contact's current ETag.
     """
-    logger.info(f"Fetching contact with ID: {contact_id}")
-    contact = await repository_contacts.get_contact_by_id(contact_id, db)
+    logger.info("Fetching contact with ID: %s", contact_id)
+    contact = await contact_loader.load(contact_id)
     if contact is None:
-        logger.warning(f"Contact with ID {contact_id} not found.")
+        logger.warning("Contact with ID %s not found.", contact_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
+    etag = contact_etag(contact.id, contact.version)
+    if none_match(if_none_match, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
     return contact
 
 
-@router.put("/{contact_id}", response_model=ContactResponse)
+@router.put("/{contact_id}", response_model=ContactResponse, dependencies=[admit("write")])
 async def update_contact(
-    contact_id: int, body: ContactCreate, db: AsyncSession = Depends(get_db)
+    contact_id: int,
+    body: ContactCreate,
+    response: Response,
+    if_match: Optional[str] = IF_MATCH_HEADER,
+    repository: ContactRepository = Depends(get_repository),
 ):
     """
     Performs a full update of a contact.
+
+    With `If-Match`, the update only applies if the contact still has that ETag.
     """
-    logger.info(f"Updating contact with ID: {contact_id}")
-    contact = await repository_contacts.update_contact(contact_id, body, db)
+    logger.info("Updating contact with ID: %s", contact_id)
+    try:
+        contact = await repository.update_contact(
+            contact_id, body, expected_versions=expected_versions(if_match, contact_id)
+        )
+    except ContactConflictError as exc:
+        logger.warning("Update of contact with ID %s conflicts with another contact.", contact_id)
+        raise _conflict(exc)
+    except StaleContactError as exc:
+        logger.warning("Contact with ID %s changed since %s.", contact_id, if_match)
+        raise _precondition_failed(exc)
     if contact is None:
-        logger.warning(f"Contact with ID {contact_id} not found for full update.")
+        logger.warning("Contact with ID %s not found for full update.", contact_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
+    response.headers["ETag"] = contact_etag(contact.id, contact.version)
     return contact
 
 
-@router.patch("/{contact_id}", response_model=ContactResponse)
+@router.patch("/{contact_id}", response_model=ContactResponse, dependencies=[admit("write")])
 async def partial_update_contact(
-    contact_id: int, body: ContactUpdate, db: AsyncSession = Depends(get_db)
+    contact_id: int,
+    body: ContactUpdate,
+    response: Response,
+    if_match: Optional[str] = IF_MATCH_HEADER,
+    repository: ContactRepository = Depends(get_repository),
 ):
     """
     Performs a partial update of a contact.
+
+    With `If-Match`, the update only applies if the contact still has that ETag.
     """
-    logger.info(f"Partially updating contact with ID: {contact_id}")
-    contact = await repository_contacts.update_contact(contact_id, body, db)
+    logger.info("Partially updating contact with ID: %s", contact_id)
+    try:
+        contact = await repository.update_contact(
+            contact_id, body, expected_versions=expected_versions(if_match, contact_id)
+        )
+    except ContactConflictError as exc:
+        logger.warning("Update of contact with ID %s conflicts with another contact.", contact_id)
+        raise _conflict(exc)
+    except StaleContactError as exc:
+        logger.warning("Contact with ID %s changed since %s.", contact_id, if_match)
+        raise _precondition_failed(exc)
     if contact is None:
-        logger.warning(f"Contact with ID {contact_id} not found for partial update.")
+        logger.warning("Contact with ID %s not found for partial update.", contact_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
+    response.headers["ETag"] = contact_etag(contact.id, contact.version)
     return contact
 
 
-@router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
+@router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[admit("write")])
+async def delete_contact(
+    contact_id: int,
+    if_match: Optional[str] = IF_MATCH_HEADER,
+    repository: ContactRepository = Depends(get_repository),
+):
     """
     Deletes a contact.
+
+    With `If-Match`, the contact is only deleted if it still has that ETag.
     """
-    logger.info(f"Deleting contact with ID: {contact_id}")
-    contact = await repository_contacts.remove_contact(contact_id, db)
+    logger.info("Deleting contact with ID: %s", contact_id)
+    try:
+        contact = await repository.remove_contact(
+            contact_id, expected_versions=expected_versions(if_match, contact_id)
+        )
+    except StaleContactError as exc:
+        logger.warning("Contact with ID %s changed since %s.", contact_id, if_match)
+        raise _precondition_failed(exc)
     if contact is None:
-        logger.warning(f"Contact with ID {contact_id} not found for deletion.")
+        logger.warning("Contact with ID %s not found for deletion.", contact_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
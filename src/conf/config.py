@@ -1,6 +1,19 @@
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class AdmissionClassSettings(BaseModel):
+    """
+    Limits of one class of routes (see `src.core.admission.RouteClass`).
+    """
+    limit: int
+    queue_size: int
+    max_wait: float
+    priority: int = 0
+
+
 class Settings(BaseSettings):
     """
     Application settings loaded from environment variables or a .env file.
@@ -10,6 +23,98 @@ class Settings(BaseSettings):
     """
 
     DB_URL: str
+    # Where the contacts are kept: `sqlalchemy` (the database at `DB_URL`) or
+    # `memory` (a process-local store, see `src.repository.memory`).
+    CONTACTS_BACKEND: Literal["sqlalchemy", "memory"] = "sqlalchemy"
+    # With the `memory` backend, copy the database contacts into memory at startup.
+    CONTACTS_MEMORY_PRELOAD: bool = False
+    # JSON list of read-replica URLs serving the read-only endpoints.
+    DB_REPLICA_URLS: List[str] = []
+    # Upper bound of the replication lag (or of a read racing a commit, without
+    # replicas); writes keep re-reads out of the contact cache that long.
+    DB_REPLICA_MAX_LAG_SECONDS: float = 1.0
+
+    # Connection pool of every engine (ignored for SQLite).
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    # Connections opened (and primed with the hot queries) per engine at startup.
+    DB_POOL_WARMUP_CONNECTIONS: int = 1
+    # Readiness fails when a connection cannot be checked out and pinged this fast.
+    DB_HEALTH_TIMEOUT_SECONDS: float = 2.0
+    # On shutdown, how long to wait for open sessions before disposing of the engines.
+    DB_DRAIN_TIMEOUT_SECONDS: float = 10.0
+    # Prepared statements cached per asyncpg connection; it should hold every
+    # statement shape in use (compare with `compiled_cache_entries` in /stats/pool).
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Compiled SQL strings cached per engine by SQLAlchemy.
+    DB_COMPILED_CACHE_SIZE: int = 500
+    # Statements slower than this are logged with their SQL text; unset disables it.
+    DB_SLOW_QUERY_SECONDS: Optional[float] = None
+
+    # Rows validated and inserted per statement by `POST /api/contacts/bulk`.
+    BULK_IMPORT_CHUNK_SIZE: int = 500
+    # Per-row errors kept in a bulk import report; the rest are only counted.
+    BULK_IMPORT_MAX_ERRORS: int = 1000
+    # Contacts `PATCH`/`DELETE /api/contacts/bulk` may change in one request, and
+    # rows changed per statement.
+    BULK_CHANGE_MAX_ROWS: int = 10_000
+    BULK_CHANGE_BATCH_SIZE: int = 1000
+    # Rows fetched per server-side cursor round trip by `GET /api/contacts/export`.
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Cached exact totals served with `?count=cached` (see `X-Total-Count`).
+    COUNT_CACHE_MAX_SIZE: int = 1000
+    COUNT_CACHE_TTL_SECONDS: float = 30.0
+
+    # `GET /api/contacts/changes` holds back changes younger than this, so that
+    # changes committed out of order are not skipped; it must exceed the longest
+    # write transaction.
+    CHANGE_FEED_SAFETY_LAG_SECONDS: float = 5.0
+
+    # Distinct IDs accepted by one `/api/contacts/batch` lookup.
+    CONTACT_BATCH_MAX_IDS: int = 100
+
+    # Admission control in front of the database pool (see `src.core.admission`).
+    ADMISSION_ENABLED: bool = True
+    # Requests handled at the same time over all route classes; defaults to the
+    # primary pool capacity (`DB_POOL_SIZE + DB_MAX_OVERFLOW`).
+    ADMISSION_CAPACITY: Optional[int] = None
+    # JSON map of route class to its limits; a lower priority is served first.
+    ADMISSION_CLASSES: Dict[str, AdmissionClassSettings] = {
+        "lookup": AdmissionClassSettings(limit=15, queue_size=200, max_wait=0.5, priority=0),
+        "read": AdmissionClassSettings(limit=10, queue_size=100, max_wait=1.0, priority=1),
+        "write": AdmissionClassSettings(limit=10, queue_size=100, max_wait=2.0, priority=1),
+        "search": AdmissionClassSettings(limit=4, queue_size=50, max_wait=1.0, priority=2),
+        "bulk": AdmissionClassSettings(limit=2, queue_size=4, max_wait=5.0, priority=3),
+    }
+    # `Retry-After` of requests rejected by admission control.
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Response compression (see `src.core.compression`). Codings are offered in
+    # the order listed, `br` and `zstd` only when their module is installed.
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_ENCODINGS: List[str] = ["zstd", "br", "gzip"]
+    # Bodies smaller than this are sent uncompressed.
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # gzip 1-9, br 0-11, zstd 1-22; higher levels trade CPU for fewer bytes
+    # (see `benchmarks/bench_compression.py`).
+    COMPRESSION_LEVELS: Dict[str, int] = {"gzip": 6, "br": 4, "zstd": 3}
+
+    # Read-through cache of single contacts (see `repository.cache`).
+    CONTACT_CACHE_ENABLED: bool = True
+    CONTACT_CACHE_MAX_SIZE: int = 10_000
+    CONTACT_CACHE_TTL_SECONDS: float = 60.0
+
+    # Root log level, and `json` or `text` output on stdout.
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    # Records buffered for the logging thread; more are dropped rather than blocking requests.
+    LOG_QUEUE_SIZE: int = 10_000
+    # JSON map of "METHOD /route/{template}" to the fraction (0..1) of its INFO logs kept.
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,157 @@
+import asyncio
+import collections
+import contextlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Dict, Mapping, Optional
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is not admitted; ``reason`` is ``queue_full``,
+    ``timeout`` or ``pool_saturated``.
+    """
+    def __init__(self, route_class: str, reason: str):
+        super().__init__(f"{route_class} request rejected: {reason}")
+        self.route_class = route_class
+        self.reason = reason
+
+
+@dataclass
+class RouteClass:
+    """
+    Limits of one class of routes.
+
+    :param limit: Requests of the class handled at the same time.
+    :param queue_size: Requests of the class allowed to wait for a slot.
+    :param max_wait: Seconds a request may wait before it is rejected.
+    :param priority: Freed slots go to waiting classes in ascending priority.
+    """
+    limit: int
+    queue_size: int
+    max_wait: float
+    priority: int = 0
+
+
+class _ClassState:
+    def __init__(self, name: str, config: RouteClass):
+        self.name = name
+        self.config = config
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = collections.deque()
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "timeout": 0, "pool_saturated": 0}
+
+    def has_slot(self) -> bool:
+        return self.in_flight < self.config.limit
+
+
+class AdmissionController:
+    """
+    Admits requests in front of the database pool, so that a traffic spike is
+    shed with fast rejections instead of piling up on pool checkouts.
+
+    Each route class has its own concurrency limit and a bounded FIFO queue
+    with a deadline, and all classes share ``capacity`` slots, normally the
+    size of the pool. When a slot frees up it goes to the waiting class with
+    the lowest ``priority`` value, so cheap point lookups overtake searches.
+
+    :param classes: The route classes, by name.
+    :param capacity: Requests handled at the same time, all classes together.
+    :param saturated: Tells whether the pool is exhausted by connections held
+        outside of admission control; requests that would be admitted right
+        away are then rejected instead of blocking on the pool.
+    """
+    def __init__(
+        self,
+        classes: Mapping[str, RouteClass],
+        capacity: int,
+        saturated: Optional[Callable[[], bool]] = None,
+    ):
+        self.capacity = capacity
+        self.saturated = saturated
+        self.in_flight = 0
+        self._classes = {name: _ClassState(name, config) for name, config in classes.items()}
+        self._by_priority = sorted(self._classes.values(), key=lambda state: state.config.priority)
+
+    def _dispatch(self) -> None:
+        """Hands free slots to waiting requests, highest priority first."""
+        for state in self._by_priority:
+            while state.waiters and state.has_slot() and self.in_flight < self.capacity:
+                waiter = state.waiters.popleft()
+                if waiter.done():
+                    continue
+                state.in_flight += 1
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _reject(self, state: _ClassState, reason: str) -> AdmissionRejected:
+        state.rejected[reason] += 1
+        return AdmissionRejected(state.name, reason)
+
+    async def acquire(self, route_class: str) -> None:
+        """
+        Waits for a slot of ``route_class``.
+
+        :raises AdmissionRejected: If the queue is full, the deadline passes or
+            the pool is saturated.
+        """
+        state = self._classes[route_class]
+        if not state.waiters and state.has_slot() and self.in_flight < self.capacity:
+            if self.saturated is not None and self.saturated():
+                raise self._reject(state, "pool_saturated")
+            state.in_flight += 1
+            self.in_flight += 1
+            state.admitted += 1
+            return
+        if len(state.waiters) >= state.config.queue_size:
+            raise self._reject(state, "queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=state.config.max_wait)
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release(route_class)
+            else:
+                waiter.cancel()
+                state.waiters.remove(waiter)
+            raise
+        if not waiter.done():
+            waiter.cancel()
+            state.waiters.remove(waiter)
+            raise self._reject(state, "timeout")
+        state.admitted += 1
+
+    def release(self, route_class: str) -> None:
+        state = self._classes[route_class]
+        state.in_flight -= 1
+        self.in_flight -= 1
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, route_class: str) -> AsyncIterator[None]:
+        """
+        Holds a slot of ``route_class`` for the duration of the block.
+        """
+        await self.acquire(route_class)
+        try:
+            yield
+        finally:
+            self.release(route_class)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns in-flight and queued requests, admissions and rejections by
+        reason, per route class.
+        """
+        return {
+            name: {
+                "limit": state.config.limit,
+                "in_flight": state.in_flight,
+                "queued": len(state.waiters),
+                "admitted": state.admitted,
+                **{f"rejected_{reason}": count for reason, count in state.rejected.items()},
+            }
+            for name, state in self._classes.items()
+        }
@@ -0,0 +1,295 @@
+import abc
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.core.etags import parse_etags
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional encoding
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is an optional encoding
+    zstandard = None
+
+# Media types worth compressing; images and archives are compressed already.
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Status codes whose responses have no body to compress.
+_NO_BODY_STATUSES = (204, 304)
+
+
+class Compressor(abc.ABC):
+    """
+    Incremental compressor of one response body.
+
+    ``compress`` returns whatever output is ready for a chunk and flushes it, so
+    that each chunk of a streamed response reaches the client as soon as it is
+    produced; the compression window is kept between chunks, so the ratio stays
+    close to that of compressing the whole body at once.
+    """
+    @abc.abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compresses ``data`` and returns the output flushed so far."""
+
+    @abc.abstractmethod
+    def finish(self) -> bytes:
+        """Returns the rest of the output and ends the stream."""
+
+
+class GzipCompressor(Compressor):
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(Compressor):
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor(Compressor):
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# Content-Encoding token to compressor class, for the encodings whose module is installed.
+COMPRESSORS: Dict[str, Callable[[int], Compressor]] = {"gzip": GzipCompressor}
+if brotli is not None:
+    COMPRESSORS["br"] = BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS["zstd"] = ZstdCompressor
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Splits an Accept-Encoding header into lowercased codings and their q-values.
+
+    :param header: The raw header value.
+    :return: The q-value of every listed coding, ``*`` included.
+    """
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(header: Optional[str], preference: Sequence[str]) -> Optional[str]:
+    """
+    Picks the content coding of a response.
+
+    The coding with the highest q-value wins; ties go to the one listed first in
+    ``preference``. ``*`` stands for every coding not listed, and ``q=0`` rules
+    a coding out.
+
+    :param header: The request's Accept-Encoding header, or None if not sent.
+    :param preference: Supported codings, most preferred first.
+    :return: The coding to use, or None to send the body as is.
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in preference:
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.endswith("+json") or media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _weaken(etag: str) -> str:
+    return etag if etag.startswith("W/") else "W/" + etag
+
+
+def _add_vary(headers: List[Tuple[bytes, bytes]]) -> None:
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower() and value.strip() != b"*":
+                headers[index] = (name, value + b", Accept-Encoding")
+            return
+    headers.append((b"vary", b"Accept-Encoding"))
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing response bodies with the best coding the client
+    accepts (``zstd``, ``br`` and ``gzip``, as far as their modules are installed).
+
+    Only JSON and text bodies of at least ``minimum_size`` bytes are compressed;
+    the first chunks of a streamed body are held back until that size is reached
+    or the stream ends. From then on every chunk is compressed and flushed as it
+    arrives, so exports are never buffered whole.
+
+    The compressed representation differs byte for byte from the original, so
+    its ETag is made weak. ``If-None-Match`` compares weakly and keeps working;
+    ``If-Match`` compares strongly, so clients should take the ETag for
+    conditional writes from a single contact, which is normally below
+    ``minimum_size``. A 304 is sent before any body exists, so its ETag is only
+    made weak when the client revalidates the weak tag of a compressed response.
+
+    :param preference: Codings to offer, most preferred first; unavailable ones
+        are skipped.
+    :param levels: Compression level per coding.
+    :param minimum_size: Smaller bodies are sent as is.
+    """
+    def __init__(
+        self,
+        app,
+        preference: Sequence[str] = ("zstd", "br", "gzip"),
+        levels: Optional[Dict[str, int]] = None,
+        minimum_size: int = 1024,
+    ):
+        self.app = app
+        self.preference = [coding for coding in preference if coding in COMPRESSORS]
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3, **(levels or {})}
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+            elif name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+        coding = negotiate_encoding(accept_encoding, self.preference)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(self, coding, send, if_none_match).run(scope, receive)
+
+
+class _CompressedResponse:
+    """The state of one response going through `CompressionMiddleware`."""
+    def __init__(
+        self, middleware: CompressionMiddleware, coding: str, send, if_none_match: Optional[str] = None
+    ):
+        self.middleware = middleware
+        self.coding = coding
+        self.send = send
+        self.if_none_match = if_none_match
+        self.start: Optional[Dict[str, Any]] = None
+        self.pending: List[bytes] = []
+        self.pending_size = 0
+        self.compressor: Optional[Compressor] = None
+        # Set once the body is known to go out as is.
+        self.passthrough = False
+
+    async def run(self, scope, receive) -> None:
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            self.on_start(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            self.pending.append(body)
+            self.pending_size += len(body)
+            if self.pending_size < self.middleware.minimum_size:
+                if more_body:
+                    return
+                # The whole body is below the threshold: send it unchanged.
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": b"".join(self.pending)})
+                return
+            body, self.pending = b"".join(self.pending), []
+            self.compressor = COMPRESSORS[self.coding](self.middleware.levels[self.coding])
+            self.compress_start()
+            await self.send(self.start)
+
+        data = self.compressor.compress(body) if body else b""
+        if not more_body:
+            data += self.compressor.finish()
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def on_start(self, message: Dict[str, Any]) -> None:
+        headers = list(message.get("headers", []))
+        message["headers"] = headers
+        self.start = message
+        content_type, encoded, no_transform = "", False, False
+        for name, value in headers:
+            name = name.lower()
+            if name == b"content-type":
+                content_type = value.decode("latin-1")
+            elif name == b"content-encoding":
+                encoded = True
+            elif name == b"cache-control" and b"no-transform" in value.lower():
+                no_transform = True
+        if message["status"] == 304:
+            # The size and type of the full response are unknown here, so the
+            # ETag follows the representation the client holds: weak only if
+            # the client revalidates the weak tag a compressed 200 carried.
+            self.passthrough = True
+            held = parse_etags(self.if_none_match)
+            for index, (name, value) in enumerate(headers):
+                if name.lower() == b"etag":
+                    weak = _weaken(value.decode("latin-1"))
+                    if weak in held:
+                        headers[index] = (name, weak.encode("latin-1"))
+        elif (
+            message["status"] < 200
+            or message["status"] in _NO_BODY_STATUSES
+            or encoded
+            or no_transform
+            or not _is_compressible(content_type)
+        ):
+            self.passthrough = True
+        else:
+            # Caches must key compressible responses by Accept-Encoding, compressed or not.
+            _add_vary(headers)
+
+    def compress_start(self) -> None:
+        headers = [(name, value) for name, value in self.start["headers"] if name.lower() != b"content-length"]
+        for index, (name, value) in enumerate(headers):
+            if name.lower() == b"etag":
+                headers[index] = (name, _weaken(value.decode("latin-1")).encode("latin-1"))
+        headers.append((b"content-encoding", self.coding.encode("latin-1")))
+        self.start["headers"] = headers
@@ -0,0 +1,27 @@
+import json
+from datetime import date
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serializes plain data (dicts, lists, scalars, dates) to compact JSON bytes.
+
+    Uses orjson when it is installed and falls back to the standard library. No
+    validation is done, so only trusted data, such as rows read from our own
+    database, should be passed in.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
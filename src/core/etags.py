@@ -0,0 +1,79 @@
+import hashlib
+import re
+from typing import Any, List, Optional
+
+# An entity tag as it appears in If-Match / If-None-Match: `"opaque"`, `W/"opaque"` or `*`.
+_ETAG_PATTERN = re.compile(r'\*|(?:W/)?"[^"]*"')
+
+
+def contact_etag(contact_id: int, version: int) -> str:
+    """
+    Returns the strong ETag of a single contact, e.g. ``"42.3"``.
+
+    :param contact_id: The ID of the contact.
+    :param version: The stored version of the contact.
+    :return: The quoted entity tag.
+    """
+    return f'"{contact_id}.{version}"'
+
+
+def digest_etag(*parts: Any) -> str:
+    """
+    Returns a strong ETag hashing the given parts, used for list responses.
+
+    :param parts: Values that together determine the representation.
+    :return: The quoted entity tag.
+    """
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def parse_etags(header: Optional[str]) -> List[str]:
+    """
+    Splits an If-Match or If-None-Match header into its entity tags.
+
+    :param header: The raw header value, or None when it was not sent.
+    :return: The tags as sent, weak prefix included, or ``["*"]``.
+    """
+    if not header:
+        return []
+    return _ETAG_PATTERN.findall(header)
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def none_match(header: Optional[str], etag: str) -> bool:
+    """
+    Tells whether an If-None-Match header matches ``etag``, so a 304 can be sent.
+
+    Uses the weak comparison required for If-None-Match.
+    """
+    return any(tag == "*" or _opaque(tag) == _opaque(etag) for tag in parse_etags(header))
+
+
+def expected_versions(header: Optional[str], contact_id: int) -> Optional[List[int]]:
+    """
+    Extracts the contact versions an If-Match header accepts.
+
+    If-Match uses the strong comparison, so weak tags never match. Tags of other
+    contacts and unknown tags are ignored, which may leave an empty list: the
+    precondition then fails for any existing contact.
+
+    :param header: The raw If-Match header, or None when it was not sent.
+    :param contact_id: The ID of the contact being written.
+    :return: The accepted versions, or None when any version is accepted
+        (no header, or ``*``).
+    """
+    if header is None:
+        return None
+    tags = parse_etags(header)
+    if "*" in tags:
+        return None
+    versions = []
+    prefix = f'"{contact_id}.'
+    for tag in tags:
+        if tag.startswith(prefix) and tag[len(prefix):-1].isdigit():
+            versions.append(int(tag[len(prefix):-1]))
+    return versions
@@ -1,34 +1,209 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
-from logging.config import dictConfig
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Mapping, Optional
 
-LOG_LEVEL = "INFO"
+from src.conf.config import settings
 
-LOGGING_CONFIG = {
-    "version": 1,
-    "disable_existing_loggers": False,
-    "formatters": {
-        "default": {
-            "format": "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-        }
-    },
-    "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "level": LOG_LEVEL,
-            "formatter": "default",
+# Attributes every LogRecord has; anything else was passed through `extra=`.
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# ASGI scope of the request being handled, set by `RequestLogContextMiddleware`.
+current_request_scope: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "current_request_scope", default=None
+)
+
+
+def _route_key(scope: Optional[dict]) -> Optional[str]:
+    """
+    Returns ``"METHOD /route/{template}"`` for a routed request, e.g.
+    ``"GET /api/contacts/{contact_id}"``; None outside of a request or before routing.
+    """
+    if scope is None:
+        return None
+    route = scope.get("route")
+    if route is None:
+        return None
+    return f"{scope['method']} {route.path}"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    Fields passed with ``extra=`` and the route of the current request are
+    included as top-level keys.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
         }
-    },
-    "root": {"level": LOG_LEVEL, "handlers": ["console"]},
-}
+        route = getattr(record, "route", None)
+        if route is not None:
+            entry["route"] = route
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key != "route":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RouteSamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the INFO and DEBUG records logged while handling
+    high-volume routes.
+
+    Warnings and errors always pass. Records that pass are tagged with the
+    route, so the formatter can include it.
+
+    :param rates: Sampling rate (0..1) per ``"METHOD /route/{template}"``.
+    """
+    def __init__(self, rates: Mapping[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        route = _route_key(current_request_scope.get())
+        if route is None:
+            return True
+        record.route = route
+        if record.levelno > logging.INFO:
+            return True
+        rate = self.rates.get(route)
+        if rate is None or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks the event loop.
+
+    Records are queued as they are, and their messages are only formatted by the
+    listener thread. When the bounded queue is full, records are dropped and
+    counted instead of waiting for the listener.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so the record does not need to be
+        # made picklable; a shallow copy keeps later handlers from seeing changes.
+        return copy.copy(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RequestLogContextMiddleware:
+    """
+    ASGI middleware that makes the current request visible to logging filters.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request_scope.reset(token)
+
+
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_sampling_filter: Optional[RouteSamplingFilter] = None
+_listener: Optional[QueueListener] = None
+_console: Optional[logging.Handler] = None
+_atexit_registered = False
 
 
 def setup_logging() -> None:
     """
-    Applies the logging configuration from the LOGGING_CONFIG dictionary.
+    Installs the logging pipeline on the root logger.
+
+    Application code only puts records on a bounded in-memory queue; a
+    background thread formats them (JSON by default, see `LOG_FORMAT`) and
+    writes them to stdout. The level comes from `LOG_LEVEL`, and INFO logs of
+    the routes listed in `LOG_SAMPLE_RATES` are sampled.
+
+    This function should be called once at the start of the application; later
+    calls do nothing until :func:`shutdown_logging` has run.
+    """
+    global _queue_handler, _sampling_filter, _listener, _console, _atexit_registered
+    if _listener is not None:
+        return
 
-    This function should be called once at the start of the application.
+    console = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        console.setFormatter(JsonFormatter())
+    else:
+        console.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
+
+    _sampling_filter = RouteSamplingFilter(settings.LOG_SAMPLE_RATES)
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    _queue_handler.addFilter(_sampling_filter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _console = console
+    _listener = QueueListener(_queue_handler.queue, console, respect_handler_level=True)
+    _listener.start()
+    if not _atexit_registered:
+        atexit.register(shutdown_logging)
+        _atexit_registered = True
+
+
+def shutdown_logging() -> None:
+    """
+    Writes out the queued records and stops the background thread.
+
+    Records logged afterwards, e.g. during the rest of the shutdown, are written
+    directly by the console handler instead of being queued with no reader.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    root = logging.getLogger()
+    root.removeHandler(_queue_handler)
+    _console.addFilter(_sampling_filter)
+    root.addHandler(_console)
+
+
+def logging_stats() -> Dict[str, int]:
+    """
+    Returns how many records were dropped on a full queue or sampled out.
     """
-    dictConfig(LOGGING_CONFIG)
+    return {
+        "queued": _queue_handler.queue.qsize() if _queue_handler is not None else 0,
+        "dropped": _queue_handler.dropped if _queue_handler is not None else 0,
+        "sampled_out": _sampling_filter.sampled_out if _sampling_filter is not None else 0,
+    }
 
 
 def get_logger(name: str) -> logging.Logger:
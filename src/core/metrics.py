@@ -0,0 +1,219 @@
+import contextvars
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; roughly exponential from 1 ms to 10 s.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter with labels, rendered in the Prometheus text format.
+    """
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative histogram with labels, rendered in the Prometheus text format.
+
+    Only bucket counts, the sum and the count are kept, so memory does not grow
+    with the number of observations.
+    """
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # One count per bucket, then the sum.
+            series = self._series[labels] = [0] * len(self.buckets) + [0.0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[index] += 1
+                break
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket = _labels(self.label_names, labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            suffix = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{suffix} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+def render_gauges(name: str, documentation: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """
+    Renders point-in-time values, e.g. pool or cache stats read at scrape time.
+    """
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+    return lines
+
+
+def stats_gauges(prefix: str, source: str, rows: Iterable[Tuple[Dict[str, str], Dict[str, Any]]]) -> List[str]:
+    """
+    Turns stats dictionaries (e.g. from ``/stats/pool``) into one gauge family
+    per numeric key, named ``{prefix}_{key}``.
+
+    :param prefix: Prefix of the metric names.
+    :param source: Where the values come from, for the help text.
+    :param rows: ``(labels, stats)`` pairs; non-numeric stats are skipped.
+    """
+    families: Dict[str, List[Tuple[Dict[str, str], float]]] = {}
+    for labels, stats in rows:
+        for key, value in stats.items():
+            if isinstance(value, (int, float)):
+                families.setdefault(key, []).append((labels, value))
+    lines: List[str] = []
+    for key, samples in families.items():
+        lines.extend(render_gauges(f"{prefix}_{key}", f"{key} from {source}.", samples))
+    return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time spent handling HTTP requests.", ("method", "route", "status")
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL statements per HTTP request.", ("method", "route")
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Time spent executing single SQL statements.", ("engine",)
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries_total", "SQL statements slower than DB_SLOW_QUERY_SECONDS.", ("engine",)
+)
+
+REGISTRY = (REQUEST_LATENCY, REQUEST_DB_QUERIES, REQUEST_DB_TIME, DB_QUERY_LATENCY, DB_SLOW_QUERIES)
+
+
+@dataclass
+class RequestStats:
+    """SQL work done on behalf of the current request."""
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+current_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def record_query(engine: str, seconds: float) -> None:
+    """
+    Records one executed SQL statement, against the current request if any.
+    """
+    DB_QUERY_LATENCY.observe(seconds, engine)
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, SQL statement count and SQL time per route.
+
+    Requests are labelled with the route template (``/api/contacts/{contact_id}``)
+    rather than the raw path, so the number of series stays bounded. The counters
+    are bound to the request through a context variable that the engine event
+    hooks update (see ``src.database.db``).
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUEST_LATENCY.observe(time.perf_counter() - started, method, route_path, str(status))
+            REQUEST_DB_QUERIES.observe(stats.queries, method, route_path)
+            REQUEST_DB_TIME.observe(stats.db_seconds, method, route_path)
+
+
+def render_metrics(*extra: List[str]) -> str:
+    """
+    Renders all registered metrics, followed by the given extra metric families.
+    """
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for family in extra:
+        lines.extend(family)
+    return "\n".join(lines) + "\n"
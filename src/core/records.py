@@ -0,0 +1,145 @@
+import csv
+import json
+from typing import AsyncIterator, Optional, Tuple, Union
+
+# Lines longer than this, in bytes, are dropped; a JSON contact with every
+# character escaped stays well below it.
+MAX_LINE_LENGTH = 16 * 1024
+# A contact row is well under 1 KiB of CSV; a longer record is taken to be an
+# unbalanced quote swallowing the rest of the upload.
+MAX_CSV_RECORD_LENGTH = 4096
+
+
+class RecordError(ValueError):
+    """Raised for a single record that cannot be parsed; the stream stays usable."""
+
+
+def _decode_line(line: bytes) -> str:
+    return line.rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_length: int = MAX_LINE_LENGTH
+) -> AsyncIterator[Union[str, RecordError]]:
+    """
+    Splits a stream of byte chunks into decoded text lines.
+
+    Only the current incomplete line is buffered, at most ``max_line_length``
+    bytes of it, so memory use does not depend on the size of the stream. A
+    longer line is replaced by a :class:`RecordError` and skipped up to the next
+    newline.
+
+    :param chunks: The byte chunks, e.g. ``Request.stream()``.
+    :param max_line_length: The maximum length of a line, in bytes.
+    :return: An async iterator over lines without their line terminators, or
+        errors in place of lines that were too long.
+    """
+    buffer = bytearray()
+    skipping = False
+    too_long = f"Line exceeds {max_line_length} bytes."
+    async for chunk in chunks:
+        start = 0
+        # Only the new chunk is searched for newlines, never the whole buffer.
+        while (end := chunk.find(b"\n", start)) >= 0:
+            if skipping:
+                skipping = False
+            elif len(buffer) + end - start > max_line_length:
+                yield RecordError(too_long)
+            else:
+                buffer += chunk[start:end]
+                yield _decode_line(bytes(buffer))
+            buffer.clear()
+            start = end + 1
+        if skipping:
+            continue
+        if len(buffer) + len(chunk) - start > max_line_length:
+            skipping = True
+            buffer.clear()
+            yield RecordError(too_long)
+        else:
+            buffer += chunk[start:]
+    if buffer:
+        yield _decode_line(bytes(buffer))
+
+
+async def iter_ndjson_records(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, Optional[dict], Optional[RecordError]]]:
+    """
+    Parses a newline-delimited JSON stream.
+
+    Blank lines are skipped and not counted.
+
+    :param chunks: The byte chunks of the stream.
+    :return: An async iterator of ``(row, record, error)`` tuples, where exactly
+        one of ``record`` and ``error`` is set.
+    """
+    row = 0
+    async for line in iter_lines(chunks):
+        if isinstance(line, RecordError):
+            row += 1
+            yield row, None, line
+            continue
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield row, None, RecordError(f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            yield row, None, RecordError("Expected a JSON object.")
+            continue
+        yield row, record, None
+
+
+async def iter_csv_records(
+    chunks: AsyncIterator[bytes],
+    max_record_length: int = MAX_CSV_RECORD_LENGTH,
+) -> AsyncIterator[Tuple[int, Optional[dict], Optional[RecordError]]]:
+    """
+    Parses a CSV stream whose first record is the header.
+
+    Quoted fields may span several lines. Empty fields are returned as ``None``.
+    A record longer than ``max_record_length`` characters is reported as an
+    error and dropped, so an unterminated quote cannot buffer the whole stream.
+
+    :param chunks: The byte chunks of the stream.
+    :param max_record_length: The maximum length of a record, in characters.
+    :return: An async iterator of ``(row, record, error)`` tuples, where exactly
+        one of ``record`` and ``error`` is set.
+    """
+    header = None
+    row = 0
+    pending = ""
+    async for line in iter_lines(chunks):
+        if isinstance(line, RecordError):
+            pending = ""
+            row += 1
+            yield row, None, line
+            continue
+        pending = f"{pending}\n{line}" if pending else line
+        # An odd number of quotes means a quoted field continues on the next line.
+        if pending.count('"') % 2:
+            if len(pending) > max_record_length:
+                pending = ""
+                row += 1
+                yield row, None, RecordError(f"Record exceeds {max_record_length} characters.")
+            continue
+        text, pending = pending, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, None, RecordError(
+                f"Expected {len(header)} fields, got {len(values)}."
+            )
+            continue
+        yield row, {name: value or None for name, value in zip(header, values)}, None
+    if pending:
+        yield row + 1, None, RecordError("Unterminated quoted field.")
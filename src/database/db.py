@@ -1,38 +1,388 @@
+import asyncio
 import contextlib
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import InvalidRequestError, SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from src.conf.config import settings
+from src.core.logger import get_logger
+from src.database.hooks import CommitHookSession
+from src.core.metrics import DB_SLOW_QUERIES, record_query
+
+logger = get_logger(__name__)
+
+
+class PoolCheckoutStats:
+    """
+    Counters describing how long requests wait to check out a pooled connection.
+    """
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that measures the time spent in each connection checkout.
+
+    The measured time covers waiting for a free connection, opening a new one
+    when the pool may still grow, and the optional pre-ping.
+    """
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = PoolCheckoutStats()
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        pool = super().recreate()
+        pool.checkout_stats = self.checkout_stats
+        return pool
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.checkout_stats.timeouts += 1
+            raise
+        finally:
+            self.checkout_stats.observe(time.perf_counter() - started)
+
+
+class ReadOnlyAsyncSession(AsyncSession):
+    """
+    Session for read-only requests, bound to an autocommit connection.
+
+    No BEGIN/COMMIT pair is sent, and the connection goes back to the pool as
+    soon as each result has been buffered instead of being held until the
+    request ends. Loaded objects stay usable; they are only detached. Writes are
+    rejected.
+    """
+    def _reject_writes(self, statement: Any) -> None:
+        if getattr(statement, "is_dml", False) or self.new or self.dirty or self.deleted:
+            raise InvalidRequestError("Read-only sessions cannot write.")
+
+    async def execute(self, statement, *args: Any, **kwargs: Any):
+        self._reject_writes(statement)
+        try:
+            return await super().execute(statement, *args, **kwargs)
+        finally:
+            await self.close()
+
+    async def scalar(self, statement, *args: Any, **kwargs: Any):
+        self._reject_writes(statement)
+        try:
+            return await super().scalar(statement, *args, **kwargs)
+        finally:
+            await self.close()
+
+    async def get(self, *args: Any, **kwargs: Any):
+        try:
+            return await super().get(*args, **kwargs)
+        finally:
+            await self.close()
+
+    async def flush(self, objects: Any = None) -> None:
+        self._reject_writes(None)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    """
+    Creates an async engine with the pool configured from the `DB_POOL_*` settings.
+
+    SQLite (used for local runs and benchmarks) keeps SQLAlchemy's default pool.
+    """
+    backend = make_url(url)
+    kwargs: Dict[str, Any] = {"echo": False, "query_cache_size": settings.DB_COMPILED_CACHE_SIZE}
+    if backend.get_backend_name() != "sqlite":
+        kwargs.update(
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    if backend.get_driver_name() == "asyncpg":
+        kwargs["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return create_async_engine(url, **kwargs)
+
+
+def _instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Times every statement run on ``engine`` (see ``src.core.metrics``) and logs
+    those slower than `DB_SLOW_QUERY_SECONDS`.
+
+    Engines derived with ``execution_options()`` share these hooks.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._query_started
+        record_query(name, seconds)
+        threshold = settings.DB_SLOW_QUERY_SECONDS
+        if threshold is not None and seconds >= threshold:
+            DB_SLOW_QUERIES.inc(name)
+            logger.warning("Slow query on %s (%.3fs): %s", name, seconds, statement)
+
+
+def _statement_cache_status(engine: AsyncEngine) -> Dict[str, Any]:
+    """
+    Returns the fill of SQLAlchemy's compiled-SQL cache and the size of the
+    per-connection asyncpg prepared-statement cache (0 on other drivers).
+    """
+    compiled = engine.sync_engine._compiled_cache
+    prepared = settings.DB_STATEMENT_CACHE_SIZE if engine.dialect.driver == "asyncpg" else 0
+    return {
+        "compiled_cache_entries": len(compiled) if compiled is not None else 0,
+        "compiled_cache_size": settings.DB_COMPILED_CACHE_SIZE,
+        "prepared_statement_cache_size": prepared,
+    }
+
+
+def _pool_status(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedAsyncQueuePool):
+        return {"pool": type(pool).__name__, **_statement_cache_status(engine)}
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    stats = pool.checkout_stats
+    return {
+        "pool": type(pool).__name__,
+        **_statement_cache_status(engine),
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "saturation": pool.checkedout() / capacity if capacity else 0.0,
+        "checkouts": stats.checkouts,
+        "checkout_timeouts": stats.timeouts,
+        "checkout_wait_seconds_total": stats.wait_seconds_total,
+        "checkout_wait_seconds_max": stats.wait_seconds_max,
+    }
+
 
 class DatabaseSessionManager:
     """
     Manages asynchronous database sessions for SQLAlchemy.
 
-    This class handles the creation of the async engine and provides a context manager
-    for managing database sessions, ensuring transactions are properly committed or
-    rolled back.
+    This class handles the creation of the async engines and provides a context
+    manager for managing database sessions, ensuring transactions are properly
+    committed or rolled back. Read-only sessions are spread round-robin over the
+    read replicas when any are configured, and use the primary otherwise.
+
+    Engines are created by :meth:`init`, called from the application lifespan or,
+    failing that, by the first session; constructing the manager has no cost.
+    Open sessions are counted so that shutdown can wait for them (:meth:`drain`).
     """
-    def __init__(self, url: str):
-        self._engine: AsyncEngine = create_async_engine(url, echo=False)
-        self._session_maker: async_sessionmaker[AsyncSession] = async_sessionmaker(
-            bind=self._engine,
+    def __init__(self, url: str, replica_urls: Sequence[str] = ()):
+        self._url = url
+        self._replica_urls = list(replica_urls)
+        self._engine: Optional[AsyncEngine] = None
+        self._replica_engines: List[AsyncEngine] = []
+        self._active_sessions = 0
+        self.draining = False
+
+    @property
+    def started(self) -> bool:
+        return self._engine is not None
+
+    def init(self) -> None:
+        """
+        Creates the engines and session factories; does nothing if already done.
+
+        No connection is opened here, see :meth:`warm_up`.
+        """
+        if self._engine is not None:
+            return
+        self._engine = _create_engine(self._url)
+        self._replica_engines = [_create_engine(replica_url) for replica_url in self._replica_urls]
+        _instrument_engine(self._engine, "primary")
+        for index, engine in enumerate(self._replica_engines):
+            _instrument_engine(engine, f"replica{index}")
+        read_engines = self._replica_engines or [self._engine]
+        self._session_maker: async_sessionmaker[AsyncSession] = self._make_session_maker(self._engine)
+        self._next_replica = itertools.cycle(
+            [self._make_session_maker(engine) for engine in self._replica_engines] or [self._session_maker]
+        )
+        # Autocommit engines share the pools of the engines they are derived from.
+        self._next_read_session_maker = itertools.cycle(
+            [
+                self._make_session_maker(
+                    engine.execution_options(isolation_level="AUTOCOMMIT"), ReadOnlyAsyncSession
+                )
+                for engine in read_engines
+            ]
+        )
+        self.draining = False
+
+    @property
+    def engine(self) -> AsyncEngine:
+        self.init()
+        return self._engine
+
+    @staticmethod
+    def _make_session_maker(
+        engine: AsyncEngine, session_class: type[AsyncSession] = CommitHookSession
+    ) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(
+            bind=engine,
+            class_=session_class,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
 
     @contextlib.asynccontextmanager
-    async def session(self):
-        session = self._session_maker()
+    async def _tracked(self, session_maker: async_sessionmaker[AsyncSession]):
+        self._active_sessions += 1
+        session = session_maker()
         try:
             yield session
-            await session.commit()
-        except SQLAlchemyError:
-            await session.rollback()
-            raise
         finally:
-            await session.close()
+            try:
+                await session.close()
+            finally:
+                self._active_sessions -= 1
+
+    @contextlib.asynccontextmanager
+    async def session(self, read_only: bool = False):
+        self.init()
+        session_maker = next(self._next_replica) if read_only else self._session_maker
+        async with self._tracked(session_maker) as session:
+            try:
+                yield session
+                await session.commit()
+            except SQLAlchemyError:
+                await session.rollback()
+                raise
+
+    @contextlib.asynccontextmanager
+    async def read_session(self):
+        """
+        Provides a :class:`ReadOnlyAsyncSession`, on a read replica when configured.
+
+        Statements run in autocommit mode, so they cannot use server-side cursors;
+        streaming reads should use ``session(read_only=True)`` instead.
+        """
+        self.init()
+        async with self._tracked(next(self._next_read_session_maker)) as session:
+            yield session
+
+    async def warm_up(
+        self,
+        connections: int,
+        prime: Optional[Callable[[AsyncSession], Awaitable[Any]]] = None,
+    ) -> None:
+        """
+        Opens up to ``connections`` pooled connections per engine ahead of traffic.
+
+        The connections are held at the same time, so the pool really grows to that
+        size, and ``prime`` runs on each of them to fill the compiled-statement and
+        prepared-statement caches.
+
+        :param connections: The connections to open per engine, at most the pool size.
+        :param prime: Optional coroutine function run with a session on each connection.
+        """
+        self.init()
+
+        async def open_connection(engine: AsyncEngine) -> None:
+            async with engine.connect() as connection:
+                if prime is None:
+                    await connection.execute(text("SELECT 1"))
+                    return
+                async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+                    await prime(session)
+
+        for engine in [self._engine, *self._replica_engines]:
+            count = connections
+            if isinstance(engine.pool, InstrumentedAsyncQueuePool):
+                count = min(count, engine.pool.size())
+            await asyncio.gather(*(open_connection(engine) for _ in range(max(count, 0))))
+
+    async def ping(self, timeout: float) -> bool:
+        """
+        Tells whether a pooled connection can be checked out and used within ``timeout``.
+        """
+        if not self.started:
+            return False
+        try:
+            async with asyncio.timeout(timeout):
+                async with self._engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+        except (TimeoutError, SQLAlchemyError, OSError):
+            return False
+        return True
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stops reporting ready and waits up to ``timeout`` for open sessions to close.
+
+        :return: True if all sessions closed in time.
+        """
+        self.draining = True
+        deadline = time.monotonic() + timeout
+        while self._active_sessions and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._active_sessions:
+            logger.warning("Shutting down with %s database sessions still open.", self._active_sessions)
+        return not self._active_sessions
+
+    async def close(self) -> None:
+        """
+        Disposes of all engines, closing their pooled connections.
+        """
+        if self._engine is None:
+            return
+        for engine in [self._engine, *self._replica_engines]:
+            await engine.dispose()
+        self._engine = None
+        self._replica_engines = []
 
-sessionmanager = DatabaseSessionManager(settings.DB_URL)
+    def pool_saturated(self) -> bool:
+        """
+        Tells whether every connection the primary pool may open is checked out,
+        so that a new checkout would have to wait.
+        """
+        if self._engine is None:
+            return False
+        pool = self._engine.pool
+        if not isinstance(pool, InstrumentedAsyncQueuePool) or pool._max_overflow < 0:
+            return False
+        return pool.checkedout() >= pool.size() + pool._max_overflow
+
+    def pool_status(self) -> Dict[str, Any]:
+        """
+        Returns checkout wait times and saturation of the primary and replica pools,
+        and the fill of their statement caches.
+        """
+        return {
+            "started": self.started,
+            "draining": self.draining,
+            "active_sessions": self._active_sessions,
+            "primary": _pool_status(self._engine) if self._engine is not None else {},
+            "replicas": [_pool_status(engine) for engine in self._replica_engines],
+        }
+
+sessionmanager = DatabaseSessionManager(settings.DB_URL, settings.DB_REPLICA_URLS)
 
 async def get_db():
     """
@@ -46,3 +396,18 @@ async def get_db():
     """
     async with sessionmanager.session() as session:
         yield session
+
+
+async def get_read_db():
+    """
+    FastAPI dependency that provides a session for read-only endpoints.
+
+    The session runs in autocommit mode, without a BEGIN/COMMIT pair, and holds a
+    pooled connection only while a query runs. It is bound to a read replica when
+    `DB_REPLICA_URLS` is set, and rejects writes.
+
+    Yields:
+        AsyncSession: The asynchronous database session.
+    """
+    async with sessionmanager.read_session() as session:
+        yield session
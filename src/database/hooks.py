@@ -0,0 +1,34 @@
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Kept apart from `src.database.db`, so the repository can register callbacks
+# without importing the session manager, which reads `DB_URL` on import.
+
+
+class CommitHookSession(AsyncSession):
+    """
+    Session that runs the callbacks registered with :func:`after_commit` once its
+    transaction has committed; a rollback discards them.
+    """
+    async def commit(self) -> None:
+        await super().commit()
+        for callback in self.info.pop("after_commit", []):
+            await callback()
+
+    async def rollback(self) -> None:
+        self.info.pop("after_commit", None)
+        await super().rollback()
+
+
+async def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Runs ``callback`` once the current transaction of ``session`` commits, e.g. to
+    drop cache entries only when other sessions can read the new rows.
+
+    Sessions of another class run it right away.
+    """
+    if isinstance(session, CommitHookSession):
+        session.info.setdefault("after_commit", []).append(callback)
+    else:
+        await callback()
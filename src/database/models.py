@@ -1,11 +1,53 @@
-from datetime import date
-from sqlalchemy import String, Date
+import re
+import unicodedata
+from datetime import date, datetime
+from sqlalchemy import BigInteger, String, Date, DateTime, Index, Integer, Sequence, SmallInteger, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+def birthday_key(value: date) -> int:
+    """
+    Returns the month-day key of a date, e.g. ``1231`` for 31 December.
+
+    Unlike the day of the year, the key does not depend on whether the year is a
+    leap year, so it can be stored and compared across years.
+    """
+    return value.month * 100 + value.day
+
+
+def email_key(email: str) -> str:
+    """
+    Returns the duplicate-detection key of an email: trimmed and lower-cased.
+    """
+    return email.strip().lower()
+
+
+def phone_key(phone: str) -> str:
+    """
+    Returns the duplicate-detection key of a phone number: its digits only, in
+    E.164 style without the ``+``, so ``+38 (050) 123-45-67`` and
+    ``00380501234567`` both become ``380501234567``.
+    """
+    digits = re.sub(r"[^0-9]", "", phone)
+    return digits[2:] if digits.startswith("00") else digits
+
+
+def name_key(name: str) -> str:
+    """
+    Returns the duplicate-detection key of a first or last name: Unicode
+    normalized, case-folded and with whitespace collapsed.
+    """
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
 class Base(DeclarativeBase):
     """Basic class for all ORM"""
     pass
 
+# Orders all contact changes (inserts, updates and deletions) for the change feed.
+# Databases without sequences use `ChangeCounter` instead (see
+# `repository.contacts._next_change_seq`).
+CONTACT_CHANGE_SEQ = Sequence("contacts_change_seq")
+
 class Contact(Base):
     """
     SQLAlchemy model for the 'contacts' table.
@@ -21,4 +63,71 @@ class Contact(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
     phone: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     birthday: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    # Month-day key of `birthday` (see `birthday_key`), maintained by the repository on every write.
+    birthday_md: Mapped[int] = mapped_column(SmallInteger, nullable=False)
     additional_data: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Normalized keys of duplicate detection (see `email_key`, `phone_key` and
+    # `name_key`), maintained by the repository on every write.
+    email_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    phone_key: Mapped[str] = mapped_column(String(50), nullable=False)
+    first_name_key: Mapped[str] = mapped_column(String(100), nullable=False)
+    last_name_key: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Incremented on every update; the ETag of the contact is derived from it.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    # Position of the latest insert or update of the contact in the change feed.
+    change_seq: Mapped[int] = mapped_column(BigInteger, CONTACT_CHANGE_SEQ, nullable=False, index=True)
+
+    __table_args__ = (
+        # Serves the upcoming-birthdays window as an index range scan already in output order.
+        Index("ix_contacts_birthday_md", "birthday_md", "last_name", "first_name", "id"),
+        # Serve the duplicate groups as index scans already in output order.
+        Index("ix_contacts_email_key", "email_key", "id"),
+        Index("ix_contacts_phone_key", "phone_key", "id"),
+        Index("ix_contacts_name_key", "last_name_key", "first_name_key", "id"),
+    )
+
+
+class ContactTombstone(Base):
+    """
+    SQLAlchemy model for the 'contact_tombstones' table.
+
+    One row per deleted contact ID, so the change feed can report deletions.
+    """
+    __tablename__ = "contact_tombstones"
+
+    contact_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    change_seq: Mapped[int] = mapped_column(BigInteger, CONTACT_CHANGE_SEQ, nullable=False, index=True)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class ChangeCounter(Base):
+    """
+    SQLAlchemy model for the 'change_counters' table: named counters standing in
+    for sequences on databases that have none (SQLite).
+    """
+    __tablename__ = "change_counters"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+# Text search indexes (see `repository.contacts.search_contacts`). Trigram GIN
+# indexes serve `ILIKE '%query%'`, `lower(...) text_pattern_ops` b-trees serve the
+# prefix fast path. Both need PostgreSQL (and the pg_trgm extension).
+for _column in (Contact.first_name, Contact.last_name, Contact.email):
+    Index(
+        f"ix_contacts_{_column.key}_trgm",
+        _column,
+        postgresql_using="gin",
+        postgresql_ops={_column.key: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
+    Index(
+        f"ix_contacts_{_column.key}_prefix",
+        func.lower(_column).label(f"{_column.key}_lower"),
+        postgresql_ops={f"{_column.key}_lower": "text_pattern_ops"},
+    ).ddl_if(dialect="postgresql")
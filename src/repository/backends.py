@@ -0,0 +1,111 @@
+import contextlib
+from typing import AsyncIterator, Dict, List
+
+from sqlalchemy import select
+
+from src.conf.config import settings
+from src.database.db import sessionmanager
+from src.database.models import Contact
+from src.repository.base import ContactRepository
+from src.repository.loader import BatchLoader
+from src.repository.memory import InMemoryContactRepository
+from src.repository.sql import SqlAlchemyContactRepository
+
+# The contacts of the `memory` backend, shared by all requests of the process.
+memory_repository = InMemoryContactRepository()
+
+
+def uses_database() -> bool:
+    """
+    Tells whether `CONTACTS_BACKEND` keeps the contacts in the database.
+    """
+    return settings.CONTACTS_BACKEND == "sqlalchemy"
+
+
+@contextlib.asynccontextmanager
+async def repository_session(read_only: bool = False) -> AsyncIterator[ContactRepository]:
+    """
+    Provides a repository of the configured backend for one unit of work.
+
+    With the database backend it is bound to a session that is committed on
+    success, like ``sessionmanager.session``; streaming reads should use this
+    one with ``read_only=True``.
+    """
+    if not uses_database():
+        yield memory_repository
+        return
+    async with sessionmanager.session(read_only=read_only) as db:
+        yield SqlAlchemyContactRepository(db)
+
+
+@contextlib.asynccontextmanager
+async def read_repository() -> AsyncIterator[ContactRepository]:
+    """
+    Provides a repository for reads, bound to ``sessionmanager.read_session``
+    with the database backend.
+    """
+    if not uses_database():
+        yield memory_repository
+        return
+    async with sessionmanager.read_session() as db:
+        yield SqlAlchemyContactRepository(db)
+
+
+async def get_repository():
+    """
+    FastAPI dependency that provides the contact repository of a request.
+
+    Yields:
+        ContactRepository: The repository of the configured backend.
+    """
+    async with repository_session() as repository:
+        yield repository
+
+
+async def get_read_repository():
+    """
+    FastAPI dependency that provides the contact repository of a read-only
+    endpoint (see `get_read_db`).
+
+    Yields:
+        ContactRepository: The repository of the configured backend.
+    """
+    async with read_repository() as repository:
+        yield repository
+
+
+def contact_loader(max_batch_size: int = 500) -> BatchLoader[int, object]:
+    """
+    Returns a loader that merges concurrent get-by-ID lookups into
+    ``get_contacts_by_ids`` calls.
+
+    Each batch gets its own repository from :func:`read_repository`, since the
+    lookups it merges come from different requests.
+
+    :param max_batch_size: The maximum number of IDs per query.
+    :return: The loader; ``await loader.load(contact_id)`` returns the contact or None.
+    """
+    async def fetch(contact_ids: List[int]) -> Dict[int, object]:
+        async with read_repository() as repository:
+            contacts = await repository.get_contacts_by_ids(contact_ids)
+        return {contact.id: contact for contact in contacts}
+
+    return BatchLoader(fetch, max_batch_size=max_batch_size)
+
+
+async def preload_memory_repository(batch_size: int = 1000) -> int:
+    """
+    Copies every contact from the database into the `memory` backend, in ID
+    order, ``batch_size`` rows per round trip.
+
+    The copy is a snapshot: later database writes are not replicated.
+
+    :return: The number of contacts loaded.
+    """
+    loaded = 0
+    async with sessionmanager.session(read_only=True) as db:
+        stmt = select(Contact).order_by(Contact.id).execution_options(yield_per=batch_size)
+        result = await db.stream_scalars(stmt)
+        async for batch in result.partitions():
+            loaded += memory_repository.load(batch)
+    return loaded
@@ -0,0 +1,132 @@
+import abc
+from typing import Any, AsyncIterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from src.repository.pagination import Page
+from src.schemas import ContactBulkChanges, ContactCreate, ContactUpdate
+
+
+class ContactRepository(abc.ABC):
+    """
+    The contact operations the API needs, independent of where contacts are kept.
+
+    A repository is bound to one unit of work, e.g. one database session, and is
+    created per request (see ``src.repository.backends``). Contacts are returned
+    as objects with the attributes of ``Contact``; with a sparse fieldset, list
+    items are plain dictionaries instead.
+
+    The SQLAlchemy functions of ``src.repository.contacts`` document the exact
+    semantics every backend follows, and raise the same errors.
+    """
+
+    @abc.abstractmethod
+    async def create_contact(self, body: ContactCreate) -> Any:
+        """See :func:`src.repository.contacts.create_contact`."""
+
+    @abc.abstractmethod
+    async def bulk_insert_contacts(self, bodies: List[ContactCreate]) -> Set[str]:
+        """See :func:`src.repository.contacts.bulk_insert_contacts`."""
+
+    @abc.abstractmethod
+    async def get_contacts(
+        self,
+        skip: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        """See :func:`src.repository.contacts.get_contacts`."""
+
+    @abc.abstractmethod
+    async def get_contact_by_id(self, contact_id: int) -> Optional[Any]:
+        """See :func:`src.repository.contacts.get_contact_by_id`."""
+
+    @abc.abstractmethod
+    async def get_contact_by_email(self, email: str) -> Optional[Any]:
+        """See :func:`src.repository.contacts.get_contact_by_email`."""
+
+    @abc.abstractmethod
+    async def get_contacts_by_ids(self, contact_ids: Sequence[int]) -> List[Any]:
+        """See :func:`src.repository.contacts.get_contacts_by_ids`."""
+
+    @abc.abstractmethod
+    async def update_contact(
+        self,
+        contact_id: int,
+        body: ContactUpdate,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> Optional[Any]:
+        """See :func:`src.repository.contacts.update_contact`."""
+
+    @abc.abstractmethod
+    async def remove_contact(
+        self, contact_id: int, expected_versions: Optional[Sequence[int]] = None
+    ) -> Optional[Any]:
+        """See :func:`src.repository.contacts.remove_contact`."""
+
+    @abc.abstractmethod
+    async def search_contacts(
+        self,
+        query: str,
+        skip: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        """See :func:`src.repository.contacts.search_contacts`."""
+
+    @abc.abstractmethod
+    async def count_contacts(self, query: Optional[str] = None, mode: str = "cached") -> Tuple[int, str]:
+        """See :func:`src.repository.contacts.count_contacts`."""
+
+    @abc.abstractmethod
+    async def get_upcoming_birthdays(
+        self,
+        days: int = 7,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        """See :func:`src.repository.contacts.get_upcoming_birthdays`."""
+
+    @abc.abstractmethod
+    def stream_contacts(
+        self, query: Optional[str] = None, days: Optional[int] = None, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Mapping[str, Any]]]:
+        """See :func:`src.repository.contacts.stream_contacts`."""
+
+    @abc.abstractmethod
+    async def bulk_update_contacts(
+        self,
+        changes: ContactBulkChanges,
+        contact_ids: Optional[Sequence[int]] = None,
+        query: Optional[str] = None,
+        days: Optional[int] = None,
+        max_rows: int = 10_000,
+        batch_size: int = 1000,
+    ) -> List[int]:
+        """See :func:`src.repository.contacts.bulk_update_contacts`."""
+
+    @abc.abstractmethod
+    async def bulk_remove_contacts(
+        self,
+        contact_ids: Optional[Sequence[int]] = None,
+        query: Optional[str] = None,
+        days: Optional[int] = None,
+        max_rows: int = 10_000,
+        batch_size: int = 1000,
+    ) -> List[int]:
+        """See :func:`src.repository.contacts.bulk_remove_contacts`."""
+
+    @abc.abstractmethod
+    async def find_duplicates(self, by: str = "email", limit: int = 50, cursor: Optional[str] = None) -> Page:
+        """See :func:`src.repository.contacts.find_duplicates`."""
+
+    @abc.abstractmethod
+    async def get_changes(self, since: Optional[str] = None, limit: int = 100, safety_lag: float = 5.0):
+        """See :func:`src.repository.contacts.get_changes`."""
+
+    @abc.abstractmethod
+    async def commit(self) -> None:
+        """
+        Makes the writes done so far durable, e.g. between chunks of a bulk import.
+        """
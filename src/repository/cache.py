@@ -0,0 +1,267 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from src.conf.config import settings
+from src.database.models import Contact
+
+
+class LRUCache:
+    """
+    In-process least-recently-used cache with a size bound and a per-entry TTL.
+
+    Counts hits, misses, evictions (entries dropped to respect ``max_size``) and
+    expirations, so the cache can be sized from production numbers.
+    """
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CacheBackend(ABC):
+    """
+    Interface of a cache shared between application processes (e.g. Redis).
+
+    Values are plain JSON-compatible dictionaries, so implementations are free to
+    serialize them.
+    """
+    @abstractmethod
+    async def get(self, key: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: dict, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Dictionary-backed :class:`CacheBackend`, a stand-in for a shared cache in tests.
+
+    Values are copied on the way in and out, like a serializing backend would.
+    """
+    def __init__(self):
+        self._entries: Dict[str, tuple[float, dict]] = {}
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return dict(value)
+
+    async def set(self, key: str, value: dict, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, dict(value))
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+
+def _dump_contact(contact: Contact) -> dict:
+    data = {}
+    for column in Contact.__table__.columns:
+        value = getattr(contact, column.key)
+        data[column.key] = value.isoformat() if isinstance(value, date) else value
+    return data
+
+
+def _load_contact(data: dict) -> Contact:
+    values = {}
+    for column in Contact.__table__.columns:
+        value = data.get(column.key)
+        python_type = column.type.python_type
+        if value is not None and issubclass(python_type, date):
+            value = python_type.fromisoformat(value)
+        values[column.key] = value
+    return Contact(**values)
+
+
+def _id_key(contact_id: int) -> str:
+    return f"contact:id:{contact_id}"
+
+
+def _email_key(email: str) -> str:
+    return f"contact:email:{email}"
+
+
+class ContactCache:
+    """
+    Read-through cache of contacts in front of the repository.
+
+    Contacts are cached by ID as dictionaries of column values; email lookups are
+    cached as an email -> ID mapping that is checked against the cached contact,
+    so a stale mapping left behind by an email change is never served. Lookups go
+    to the in-process LRU first, then to the optional shared backend.
+
+    Writers invalidate a contact after their commit. A read that started before
+    it, or one served by a lagging replica, may still return the old row, so for
+    ``write_hold`` seconds after a contact is invalidated it is not cached again.
+    """
+    def __init__(
+        self,
+        local: LRUCache,
+        shared: Optional[CacheBackend] = None,
+        enabled: bool = True,
+        write_hold: float = 0.0,
+    ):
+        self.local = local
+        self.shared = shared
+        self.enabled = enabled
+        self.write_hold = write_hold
+        self._held_until: Dict[str, float] = {}
+
+    def _is_held(self, *keys: str) -> bool:
+        if not self._held_until:
+            return False
+        now = time.monotonic()
+        return any(self._held_until.get(key, 0.0) > now for key in keys)
+
+    def _hold(self, keys: List[str]) -> None:
+        now = time.monotonic()
+        self._held_until = {key: until for key, until in self._held_until.items() if until > now}
+        for key in keys:
+            self._held_until[key] = now + self.write_hold
+
+    async def _get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    async def _set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        if self.shared is not None:
+            await self.shared.set(key, value, self.local.ttl)
+
+    async def get_by_id(self, contact_id: int) -> Optional[Contact]:
+        """
+        Returns a detached copy of the cached contact, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+        data = await self._get(_id_key(contact_id))
+        return _load_contact(data) if data is not None else None
+
+    async def get_by_email(self, email: str) -> Optional[Contact]:
+        """
+        Returns a detached copy of the cached contact with this email, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+        mapping = await self._get(_email_key(email))
+        if mapping is None:
+            return None
+        contact = await self.get_by_id(mapping["id"])
+        if contact is None or contact.email != email:
+            return None
+        return contact
+
+    async def store(self, contact: Contact) -> None:
+        """
+        Caches a contact under its ID and its email.
+        """
+        id_key, email_key = _id_key(contact.id), _email_key(contact.email)
+        if not self.enabled or self._is_held(id_key, email_key):
+            return
+        await self._set(id_key, _dump_contact(contact))
+        await self._set(email_key, {"id": contact.id})
+
+    async def invalidate(self, contact_id: Optional[int] = None, *emails: Optional[str]) -> None:
+        """
+        Drops a contact and the given email lookups from both cache tiers.
+        """
+        keys = [_email_key(email) for email in emails if email]
+        if contact_id is not None:
+            keys.append(_id_key(contact_id))
+        await self._drop(keys)
+
+    async def invalidate_many(self, contacts: Iterable[Tuple[int, Optional[str]]]) -> None:
+        """
+        Same as :meth:`invalidate` for many ``(id, email)`` pairs, with a single
+        call to the shared backend.
+        """
+        keys = []
+        for contact_id, email in contacts:
+            keys.append(_id_key(contact_id))
+            if email:
+                keys.append(_email_key(email))
+        await self._drop(keys)
+
+    async def _drop(self, keys: List[str]) -> None:
+        for key in keys:
+            self.local.delete(key)
+        if self.write_hold > 0:
+            self._hold(keys)
+        if self.shared is not None and keys:
+            await self.shared.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "shared": self.shared is not None, **self.local.stats()}
+
+
+contact_cache = ContactCache(
+    LRUCache(settings.CONTACT_CACHE_MAX_SIZE, settings.CONTACT_CACHE_TTL_SECONDS),
+    enabled=settings.CONTACT_CACHE_ENABLED,
+    write_hold=settings.DB_REPLICA_MAX_LAG_SECONDS,
+)
+
+# Exact row counts for `X-Total-Count`, keyed by filter. Writes in this process
+# clear it; the TTL bounds how stale counts can get from other processes' writes.
+contact_count_cache = LRUCache(settings.COUNT_CACHE_MAX_SIZE, settings.COUNT_CACHE_TTL_SECONDS)
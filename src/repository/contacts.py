@@ -1,178 +1,1243 @@
-from datetime import date, timedelta
-from typing import List, Optional
+import functools
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple, Union
 
-from sqlalchemy import select, or_, and_, extract
+from sqlalchemy import Integer, RowMapping, Select, String, and_, any_, bindparam, case, cast, delete, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
 
-from src.database.models import Contact
-from src.schemas import ContactCreate, ContactUpdate
+from src.database.hooks import after_commit
+from src.database.models import (
+    CONTACT_CHANGE_SEQ,
+    ChangeCounter,
+    Contact,
+    ContactTombstone,
+    birthday_key,
+    email_key,
+    name_key,
+    phone_key,
+)
+from src.repository.cache import contact_cache, contact_count_cache
+from src.repository.counts import planner_row_estimate, table_row_estimate
+from src.repository.pagination import (
+    InvalidCursorError,
+    Page,
+    build_page,
+    column_types,
+    decode_cursor,
+    encode_cursor,
+    keyset_after,
+    keyset_after_params,
+    keyset_params,
+)
+from src.schemas import ContactBulkChanges, ContactCreate, ContactUpdate
+
+
+class ContactConflictError(Exception):
+    """Raised when a write would duplicate the email or phone of another contact."""
+
+
+class StaleContactError(Exception):
+    """Raised when a conditional write expects a version the contact no longer has."""
+
+
+class BulkLimitError(Exception):
+    """Raised when a bulk change selects more contacts than it may change."""
+
+
+def _dialect_name(db: AsyncSession) -> str:
+    return db.get_bind().dialect.name
+
+
+# Read statements are built once per shape and then only executed with new
+# parameter values: rebuilding a `select()` and computing its cache key costs
+# more CPU than a cache hit on the compiled SQL. The shapes are bounded (sparse
+# fieldsets x paging mode x dialect), so the builders below are memoized
+# without a size limit.
+LIMIT = bindparam("limit", type_=Integer)
+OFFSET = bindparam("skip", type_=Integer)
+
+_CONTACT_BY_ID = select(Contact).where(Contact.id == bindparam("contact_id", type_=Integer))
+_CONTACT_BY_EMAIL = select(Contact).where(Contact.email == bindparam("email", type_=String))
+# One array parameter on PostgreSQL, so every batch size shares one prepared statement.
+_CONTACTS_BY_ID_ARRAY = select(Contact).where(
+    Contact.id == any_(bindparam("ids", type_=postgresql.ARRAY(Integer)))
+)
+_CONTACTS_BY_ID_LIST = select(Contact).where(Contact.id.in_(bindparam("ids", expanding=True)))
+
+
+def _fields_key(fields: Optional[Sequence[str]]) -> Optional[Tuple[str, ...]]:
+    return None if fields is None else tuple(fields)
+
+
+def _paging_mode(cursor: Optional[str], skip: int) -> str:
+    if cursor is not None:
+        return "cursor"
+    return "offset" if skip else "first"
+
+
+def _paged(stmt: Select, sort_keys: Sequence, mode: str) -> Select:
+    """
+    Adds the keyset predicate or the offset of ``mode``, the order and the limit.
+    """
+    if mode == "cursor":
+        stmt = stmt.where(keyset_after_params(sort_keys))
+    elif mode == "offset":
+        stmt = stmt.offset(OFFSET)
+    return stmt.order_by(*sort_keys).limit(LIMIT)
+
+
+def _paging_params(limit: int, skip: int, cursor_values: Optional[Sequence] = None) -> dict:
+    params = {"limit": limit + 1, "skip": skip}
+    if cursor_values is not None:
+        params.update(keyset_params(cursor_values))
+    return params
+
+
+def statement_cache_stats() -> Dict[str, int]:
+    """
+    Returns how many statement shapes each read query has built so far.
+    """
+    return {
+        name: builder.cache_info().currsize
+        for name, builder in (
+            ("list", _list_statement),
+            ("search", _search_statement),
+            ("birthdays", _birthdays_statement),
+            ("duplicates", _duplicates_statement),
+        )
+    }
+
+
+# Fields a client may select through sparse fieldsets, in response order.
+FIELD_COLUMNS = {
+    column.key: column
+    for column in (
+        Contact.first_name,
+        Contact.last_name,
+        Contact.email,
+        Contact.phone,
+        Contact.birthday,
+        Contact.additional_data,
+        Contact.id,
+    )
+}
+
+
+def _select_targets(fields: Optional[Sequence[str]], sort_columns: Sequence) -> list:
+    """
+    Returns what a list query selects: the ``Contact`` entity, or only the
+    requested fields plus the sort keys needed to build the next cursor and the
+    version needed for the page's version tag. Sort keys always end with the ID.
+    """
+    if fields is None:
+        return [Contact]
+    extra = [column for column in sort_columns if column.key not in fields]
+    return [FIELD_COLUMNS[name] for name in fields] + extra + [Contact.version]
+
+
+def _sort_values(row, fields: Optional[Sequence[str]], sort_columns: Sequence) -> tuple:
+    source = row.Contact if fields is None else row
+    return tuple(getattr(source, column.key) for column in sort_columns)
+
+
+def _row_item(row, fields: Optional[Sequence[str]]) -> Union[Contact, dict]:
+    if fields is None:
+        return row.Contact
+    return {name: getattr(row, name) for name in fields}
+
+
+def _finish_page(page: Page, fields: Optional[Sequence[str]]) -> Page[Union[Contact, dict]]:
+    """
+    Turns a page of fetched rows into a page of items with its version tag.
+    """
+    sources = [row.Contact if fields is None else row for row in page.items]
+    version_tag = hashlib.sha1(
+        ",".join(f"{source.id}.{source.version}" for source in sources).encode()
+    ).hexdigest()
+    return Page(
+        items=[_row_item(row, fields) for row in page.items],
+        next_cursor=page.next_cursor,
+        version_tag=version_tag,
+    )
+
+
+def _with_derived_columns(data: dict) -> dict:
+    """
+    Adds the values of the columns derived from the written fields.
+
+    Every write path must pass its column values through this function, so
+    derived keys never go stale.
+
+    :param data: The column values being written.
+    :return: The same values, extended with the derived columns.
+    """
+    if data.get("birthday") is not None:
+        data["birthday_md"] = birthday_key(data["birthday"])
+    if data.get("email") is not None:
+        data["email_key"] = email_key(data["email"])
+    if data.get("phone") is not None:
+        data["phone_key"] = phone_key(data["phone"])
+    for name in ("first_name", "last_name"):
+        if data.get(name) is not None:
+            data[f"{name}_key"] = name_key(data[name])
+    return data
 
 
 async def create_contact(body: ContactCreate, db: AsyncSession) -> Contact:
     """
     Creates a new contact in the database.
 
+    Runs a single ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` statement, so the
+    uniqueness check cannot race with a concurrent insert.
+
     :param body: The data for the new contact.
     :param db: The database session.
     :return: The newly created contact object.
+    :raises ContactConflictError: If the email or phone is already taken.
     """
-    
-    contact = Contact(**body.model_dump())
-    db.add(contact)
-    await db.flush()
-    await db.refresh(contact)
+
+    stmt = (
+        _insert(db, Contact)
+        .values(
+            **_with_derived_columns(body.model_dump()),
+            change_seq=await _next_change_seq(db),
+            updated_at=_change_time(db),
+        )
+        .on_conflict_do_nothing()
+        .returning(Contact)
+    )
+    contact = await db.scalar(stmt)
+    if contact is None:
+        raise ContactConflictError("Contact with this email or phone already exists.")
+    await _invalidate_on_commit(db, [(contact.id, contact.email)])
     return contact
 
-async def get_contacts(skip: int, limit: int, db: AsyncSession) -> List[Contact]:
+
+async def _invalidate_on_commit(db: AsyncSession, contacts: Sequence[Tuple[int, Optional[str]]]) -> None:
+    """
+    Drops written contacts and the cached totals once the write commits.
+
+    Dropping them earlier would let a concurrent read cache the old row again
+    until the TTL expires; reads racing the commit are kept out of the cache by
+    its write hold.
+    """
+    async def invalidate() -> None:
+        await contact_cache.invalidate_many(contacts)
+        contact_count_cache.clear()
+
+    await after_commit(db, invalidate)
+
+
+def _insert(db: AsyncSession, target=Contact.__table__):
+    """
+    Returns an INSERT into ``contacts`` that supports ``ON CONFLICT``.
+
+    :param db: The database session the statement will run on.
+    :param target: The table, or the ``Contact`` entity to get ORM objects back.
+    :return: The dialect-specific insert construct.
+    """
+    if _dialect_name(db) == "postgresql":
+        return postgresql.insert(target)
+    return sqlite.insert(target)
+
+
+async def _next_change_seq(db: AsyncSession) -> Union[int, ColumnElement[int]]:
+    """
+    Returns the ``change_seq`` for the rows of the next write statement.
+
+    On PostgreSQL this is a ``nextval()`` expression, evaluated for every row.
+    Elsewhere the counter row stands in for the sequence, and all rows of the
+    statement share its next value; SQLite runs one write transaction at a time,
+    so values are still committed in increasing order.
+    """
+    if _dialect_name(db) == "postgresql":
+        return CONTACT_CHANGE_SEQ.next_value()
+    stmt = _insert(db, ChangeCounter.__table__).values(name=CONTACT_CHANGE_SEQ.name, value=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ChangeCounter.name], set_={"value": ChangeCounter.value + 1}
+    ).returning(ChangeCounter.value)
+    return await db.scalar(stmt)
+
+
+def _change_time(db: AsyncSession) -> ColumnElement[datetime]:
+    """
+    Returns the time to store with a ``change_seq`` (see :func:`_change_horizon`).
+
+    PostgreSQL's ``now()`` is the start of the transaction, while ``nextval()``
+    runs with the statement; ``clock_timestamp()`` keeps the two in step, so the
+    feed's safety lag only has to cover the time from a write to its commit.
+    """
+    if _dialect_name(db) == "postgresql":
+        return func.clock_timestamp()
+    return func.now()
+
+
+async def _record_tombstones(db: AsyncSession, contact_ids: Sequence[int]) -> None:
+    """
+    Records the deletion of contacts for the change feed.
+
+    A contact ID deleted again (SQLite may reuse IDs) moves its tombstone to the
+    new position in the feed.
     """
-    Retrieves a list of contacts with pagination.
+    if not contact_ids:
+        return
+    change_seq = await _next_change_seq(db)
+    stmt = _insert(db, ContactTombstone.__table__).values(
+        [
+            {"contact_id": contact_id, "change_seq": change_seq, "deleted_at": _change_time(db)}
+            for contact_id in contact_ids
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ContactTombstone.contact_id],
+        set_={"change_seq": stmt.excluded.change_seq, "deleted_at": stmt.excluded.deleted_at},
+    )
+    await db.execute(stmt)
+
+
+async def bulk_insert_contacts(bodies: List[ContactCreate], db: AsyncSession) -> Set[str]:
+    """
+    Inserts many contacts with one multi-row ``INSERT ... ON CONFLICT DO NOTHING``.
+
+    Rows that violate the unique email or phone constraints are skipped instead
+    of failing the whole statement. Callers should not pass two rows with the
+    same email or phone, as only one of them could be reported as inserted.
+
+    :param bodies: The data for the new contacts.
+    :param db: The database session.
+    :return: The emails of the contacts actually inserted.
+    """
+    if not bodies:
+        return set()
+    change_seq = await _next_change_seq(db)
+    stmt = (
+        _insert(db)
+        .values([
+            {**_with_derived_columns(body.model_dump()), "change_seq": change_seq, "updated_at": _change_time(db)}
+            for body in bodies
+        ])
+        .on_conflict_do_nothing()
+        .returning(Contact.__table__.c.email)
+    )
+    result = await db.execute(stmt)
+    inserted = set(result.scalars().all())
+    if inserted:
+        await _invalidate_on_commit(db, [])
+    return inserted
+
+
+LIST_ORDER = (Contact.id,)
+
+
+@functools.cache
+def _list_statement(fields: Optional[Tuple[str, ...]], mode: str) -> Select:
+    return _paged(select(*_select_targets(fields, LIST_ORDER)), LIST_ORDER, mode)
+
+
+async def get_contacts(
+    skip: int,
+    limit: int,
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Page[Union[Contact, dict]]:
+    """
+    Retrieves a page of contacts ordered by ID.
+
+    When a ``cursor`` is given, the page starts right after the row it points to
+    (keyset pagination), so every page costs one index range scan. ``skip`` is
+    kept for backward compatibility only and is ignored in cursor mode.
 
     :param skip: The number of contacts to skip.
     :param limit: The maximum number of contacts to return.
     :param db: The database session.
-    :return: A list of contact objects.
+    :param cursor: The opaque cursor returned with the previous page.
+    :param fields: When given, only these fields (keys of ``FIELD_COLUMNS``) are
+        selected and each item is a plain dictionary instead of a ``Contact``.
+    :return: The page of contacts and the cursor of the next page.
+    :raises InvalidCursorError: If the cursor is malformed.
     """
-    
-    stmt = select(Contact).order_by(Contact.id).offset(skip).limit(limit)
-    result  = await db.execute(stmt)
-    return list(result.scalars().all())
+
+    cursor_values = decode_cursor(cursor, 1, column_types(LIST_ORDER)) if cursor is not None else None
+    stmt = _list_statement(_fields_key(fields), _paging_mode(cursor, skip))
+    result = await db.execute(stmt, _paging_params(limit, skip, cursor_values))
+    page = build_page(result.all(), limit, lambda row: _sort_values(row, fields, LIST_ORDER))
+    return _finish_page(page, fields)
+
+
+
+async def _fetch_contact_by_id(contact_id: int, db: AsyncSession) -> Optional[Contact]:
+    result = await db.execute(_CONTACT_BY_ID, {"contact_id": contact_id})
+    return result.scalar_one_or_none()
+
 
 async def get_contact_by_id(contact_id: int, db: AsyncSession) -> Optional[Contact]:
     """
-    Retrieves a single contact by its ID.
+    Retrieves a single contact by its ID, through the contact cache.
+
+    A cache hit returns a detached copy that is not attached to ``db``.
 
     :param contact_id: The ID of the contact to retrieve.
     :param db: The database session.
     :return: The contact object, or None if not found.
     """
-    
-    stmt = select(Contact).where(Contact.id == contact_id)
-    result = await db.execute(stmt)
-    return result.scalar_one_or_none()
+
+    contact = await contact_cache.get_by_id(contact_id)
+    if contact is None:
+        contact = await _fetch_contact_by_id(contact_id, db)
+        if contact is not None:
+            await contact_cache.store(contact)
+    return contact
 
 
 async def get_contact_by_email(email: str, db: AsyncSession) -> Optional[Contact]:
     """
-    Retrieves a single contact by its email address.
+    Retrieves a single contact by its email address, through the contact cache.
+
+    A cache hit returns a detached copy that is not attached to ``db``.
 
     :param email: The email of the contact to retrieve.
     :param db: The database session.
     :return: The contact object, or None if not found.
     """
-    stmt = select(Contact).where(Contact.email == email)
-    result = await db.execute(stmt)
-    return result.scalar_one_or_none()
+    contact = await contact_cache.get_by_email(email)
+    if contact is None:
+        result = await db.execute(_CONTACT_BY_EMAIL, {"email": email})
+        contact = result.scalar_one_or_none()
+        if contact is not None:
+            await contact_cache.store(contact)
+    return contact
 
 
+async def get_contacts_by_ids(contact_ids: Sequence[int], db: AsyncSession) -> List[Contact]:
+    """
+    Retrieves many contacts by ID with a single query, through the contact cache.
+
+    Only the IDs missing from the cache are queried. On PostgreSQL the query is
+    ``WHERE id = ANY(:ids)`` with one array parameter, so it is the same prepared
+    statement whatever the number of IDs; other databases use ``IN``.
+
+    :param contact_ids: The IDs to retrieve; duplicates are ignored.
+    :param db: The database session.
+    :return: The contacts found, in the order of their first ID in ``contact_ids``.
+    """
+    found: Dict[int, Contact] = {}
+    missing = []
+    for contact_id in dict.fromkeys(contact_ids):
+        contact = await contact_cache.get_by_id(contact_id)
+        if contact is None:
+            missing.append(contact_id)
+        else:
+            found[contact_id] = contact
+
+    if missing:
+        if _dialect_name(db) == "postgresql":
+            stmt = _CONTACTS_BY_ID_ARRAY
+        else:
+            stmt = _CONTACTS_BY_ID_LIST
+        result = await db.execute(stmt, {"ids": missing})
+        for contact in result.scalars():
+            found[contact.id] = contact
+            await contact_cache.store(contact)
+    return [found[contact_id] for contact_id in dict.fromkeys(contact_ids) if contact_id in found]
+
+
+def _conditional_match(
+    contact_id: int, expected_versions: Optional[Sequence[int]]
+) -> ColumnElement[bool]:
+    criteria = Contact.id == contact_id
+    if expected_versions is not None:
+        criteria = and_(criteria, Contact.version.in_(expected_versions))
+    return criteria
+
+
+# SQLSTATE of a unique constraint violation.
+UNIQUE_VIOLATION = "23505"
+
+
+def _is_unique_violation(exc: IntegrityError) -> bool:
+    """
+    Tells a unique constraint violation from other integrity errors, by SQLSTATE
+    on PostgreSQL and by extended result code on SQLite.
+    """
+    sqlstate = getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
+    if sqlstate is not None:
+        return sqlstate == UNIQUE_VIOLATION
+    return getattr(exc.orig, "sqlite_errorname", None) == "SQLITE_CONSTRAINT_UNIQUE"
+
+
+async def _raise_if_stale(
+    contact_id: int, db: AsyncSession, expected_versions: Optional[Sequence[int]]
+) -> None:
+    """
+    Tells a missing contact from a version mismatch after a conditional write
+    matched no row.
+
+    :raises StaleContactError: If the contact exists with another version.
+    """
+    if expected_versions is None:
+        return
+    exists = await db.scalar(select(Contact.id).where(Contact.id == contact_id))
+    if exists is not None:
+        raise StaleContactError("Contact has been modified.")
 
 
 async def update_contact(
-    contact_id: int, body: ContactUpdate, db: AsyncSession
+    contact_id: int,
+    body: ContactUpdate,
+    db: AsyncSession,
+    expected_versions: Optional[Sequence[int]] = None,
 ) -> Optional[Contact]:
     """
     Updates an existing contact's information.
     Only updates the fields provided in the body.
 
+    Runs a single ``UPDATE ... RETURNING`` statement, which also increments the
+    contact's version and sets ``updated_at``. With ``expected_versions`` the
+    version check is part of the same statement, so it cannot race with a
+    concurrent update.
+
     :param contact_id: The ID of the contact to update.
     :param body: The data to update the contact with.
     :param db: The database session.
+    :param expected_versions: When given, the update only applies if the stored
+        version is one of these (from an ``If-Match`` header).
     :return: The updated contact object, or None if not found.
+    :raises ContactConflictError: If the new email or phone is already taken.
+    :raises StaleContactError: If the contact exists with another version.
     """
-     
-    contact = await get_contact_by_id(contact_id, db)
-    if not contact:
-        return None
 
-    update_data = body.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(contact, key, value)
+    update_data = _with_derived_columns(body.model_dump(exclude_unset=True))
+    if not update_data:
+        contact = await _fetch_contact_by_id(contact_id, db)
+        if contact is not None and expected_versions is not None and contact.version not in expected_versions:
+            raise StaleContactError("Contact has been modified.")
+        return contact
 
-    await db.flush()
-    await db.refresh(contact)
+    stmt = (
+        update(Contact)
+        .where(_conditional_match(contact_id, expected_versions))
+        .values(
+            **update_data,
+            version=Contact.version + 1,
+            change_seq=await _next_change_seq(db),
+            updated_at=_change_time(db),
+        )
+        .returning(Contact)
+        .execution_options(populate_existing=True)
+    )
+    try:
+        contact = await db.scalar(stmt)
+    except IntegrityError as exc:
+        if not _is_unique_violation(exc):
+            raise
+        raise ContactConflictError("Contact with this email or phone already exists.") from exc
+    if contact is None:
+        await _raise_if_stale(contact_id, db, expected_versions)
+        return None
+    # The previous email is not known here; its cached mapping is rejected on
+    # read because it no longer matches the cached contact. Search totals depend
+    # on the names and email, so they are dropped too.
+    await _invalidate_on_commit(db, [(contact.id, contact.email)])
     return contact
 
 
-async def remove_contact(contact_id: int, db: AsyncSession) -> Optional[Contact]:
+async def remove_contact(
+    contact_id: int, db: AsyncSession, expected_versions: Optional[Sequence[int]] = None
+) -> Optional[Contact]:
     """
     Removes a contact from the database.
 
+    Runs a single ``DELETE ... RETURNING`` statement, and records a tombstone
+    for the change feed.
+
     :param contact_id: The ID of the contact to remove.
     :param db: The database session.
+    :param expected_versions: When given, the contact is only removed if its
+        stored version is one of these, as in :func:`update_contact`.
     :return: The removed contact object, or None if not found.
+    :raises StaleContactError: If the contact exists with another version.
     """
-    
-    contact = await get_contact_by_id(contact_id, db)
-    if not contact:
-        return None
 
-    await db.delete(contact)
+    stmt = delete(Contact).where(_conditional_match(contact_id, expected_versions)).returning(Contact)
+    contact = await db.scalar(stmt)
+    if contact is None:
+        await _raise_if_stale(contact_id, db, expected_versions)
+        return None
+    await _record_tombstones(db, [contact.id])
+    await _invalidate_on_commit(db, [(contact.id, contact.email)])
     return contact
 
 
+SEARCH_COLUMNS = (Contact.first_name, Contact.last_name, Contact.email)
+
+# pg_trgm cannot serve patterns shorter than a trigram, so shorter queries only
+# match field prefixes through the `lower(...) text_pattern_ops` indexes.
+TRIGRAM_MIN_LENGTH = 3
+
+# Relevance tiers: exact field match > field prefix match > substring match.
+# Within a tier PostgreSQL orders by trigram similarity (0..999).
+RANK_TIER_SIZE = 1000
+
+LIKE_ESCAPE = "\\"
+
+
+def _escape_like(value: str) -> str:
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+
+
+def _prefix_match(column) -> ColumnElement[bool]:
+    return func.lower(column).like(bindparam("prefix", type_=String), escape=LIKE_ESCAPE)
+
+
+def _is_short_query(query: str) -> bool:
+    return len(query) < TRIGRAM_MIN_LENGTH
+
+
+def _search_params(query: str) -> dict:
+    """
+    Returns the bind parameter values of the search filter and rank.
+    """
+    return {
+        "query": query,
+        "lowered": query.lower(),
+        "prefix": _escape_like(query.lower()) + "%",
+        "contains": "%" + _escape_like(query) + "%",
+    }
+
+
+def _search_filter(short: bool) -> ColumnElement[bool]:
+    """
+    Builds the WHERE clause of a contact search, bound with :func:`_search_params`.
+
+    :param short: Whether the query is shorter than ``TRIGRAM_MIN_LENGTH``.
+    :return: A SQL boolean expression.
+    """
+    if short:
+        return or_(*(_prefix_match(column) for column in SEARCH_COLUMNS))
+    pattern = bindparam("contains", type_=String)
+    return or_(*(column.ilike(pattern, escape=LIKE_ESCAPE) for column in SEARCH_COLUMNS))
+
+
+def _search_rank(dialect: str) -> ColumnElement[int]:
+    """
+    Builds the integer relevance rank of a contact, bound with :func:`_search_params`.
+
+    SQLite has no pg_trgm, so there only the match tier is used.
+
+    :param dialect: The name of the database dialect.
+    :return: A SQL integer expression; higher is more relevant.
+    """
+    lowered = bindparam("lowered", type_=String)
+    tier = case(
+        (or_(*(func.lower(column) == lowered for column in SEARCH_COLUMNS)), 3),
+        (or_(*(_prefix_match(column) for column in SEARCH_COLUMNS)), 2),
+        else_=1,
+    )
+    rank = tier * RANK_TIER_SIZE
+    if dialect == "postgresql":
+        query = bindparam("query", type_=String)
+        similarity = func.greatest(
+            *(func.similarity(column, query) for column in SEARCH_COLUMNS)
+        )
+        rank = rank + cast(similarity * (RANK_TIER_SIZE - 1), Integer)
+    return rank
+
+
+@functools.cache
+def _search_statement(
+    fields: Optional[Tuple[str, ...]], short: bool, mode: str, dialect: str
+) -> Select:
+    # Negating the rank keeps every sort key ascending, so the keyset predicate
+    # can stay a single row-value comparison.
+    sort_rank = (-_search_rank(dialect)).label("sort_rank")
+    stmt = select(*_select_targets(fields, LIST_ORDER), sort_rank).where(_search_filter(short))
+    return _paged(stmt, [sort_rank, *LIST_ORDER], mode)
+
+
 async def search_contacts(
     query: str,
     skip: int,
     limit: int,
     db: AsyncSession,
-) -> List[Contact]:
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Page[Union[Contact, dict]]:
     """
     Searches for contacts by a query string in first name, last name, or email.
 
+    Results are ordered by relevance, then by ID. On PostgreSQL the substring
+    match is served by pg_trgm GIN indexes; queries shorter than
+    ``TRIGRAM_MIN_LENGTH`` only match field prefixes. Supports the same keyset
+    ``cursor`` mode as :func:`get_contacts`.
+
     :param query: The search query string.
     :param skip: The number of contacts to skip for pagination.
     :param limit: The maximum number of contacts to return.
     :param db: The database session.
-    :return: A list of found contact objects.
+    :param cursor: The opaque cursor returned with the previous page.
+    :param fields: Optional sparse fieldset, as in :func:`get_contacts`.
+    :return: The page of found contacts and the cursor of the next page.
+    :raises InvalidCursorError: If the cursor is malformed.
     """
 
-    stmt = (
-        select(Contact)
-        .where(
-            or_(
-                Contact.first_name.ilike(f"%{query}%"),
-                Contact.last_name.ilike(f"%{query}%"),
-                Contact.email.ilike(f"%{query}%"),
-            )
-        )
-        .order_by(Contact.id)
-        .offset(skip)
-        .limit(limit)
+    cursor_values = (
+        decode_cursor(cursor, 2, (int, *column_types(LIST_ORDER))) if cursor is not None else None
     )
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+    stmt = _search_statement(
+        _fields_key(fields), _is_short_query(query), _paging_mode(cursor, skip), _dialect_name(db)
+    )
+    params = {**_paging_params(limit, skip, cursor_values), **_search_params(query)}
+    result = await db.execute(stmt, params)
+    page = build_page(
+        result.all(),
+        limit,
+        lambda row: (row.sort_rank, *_sort_values(row, fields, LIST_ORDER)),
+    )
+    return _finish_page(page, fields)
 
 
-async def get_upcoming_birthdays(db: AsyncSession) -> List[Contact]:
+COUNT_MODES = ("estimate", "cached", "exact")
+
+
+async def count_contacts(
+    db: AsyncSession, query: Optional[str] = None, mode: str = "cached"
+) -> Tuple[int, str]:
     """
-    Retrieves contacts with birthdays in the next 7 days.
+    Counts all contacts, or those matching a search query.
+
+    * ``estimate``: PostgreSQL planner statistics (``pg_class.reltuples``, or
+      the row estimate of ``EXPLAIN`` for a search); no rows are read. Falls
+      back to ``cached`` on other databases or before the table is analyzed.
+    * ``cached``: an exact count, reused until a write in this process or
+      `COUNT_CACHE_TTL_SECONDS`.
+    * ``exact``: always runs ``COUNT(*)``, which scans the matching rows.
 
     :param db: The database session.
-    :return: A list of contacts with upcoming birthdays.
+    :param query: Optional search query, matched like in :func:`search_contacts`.
+    :param mode: One of ``COUNT_MODES``.
+    :return: The count and the mode that actually produced it.
     """
+    criteria = _search_filter(_is_short_query(query)) if query else None
+    params = _search_params(query) if query else {}
+    if mode == "estimate" and _dialect_name(db) == "postgresql":
+        if criteria is None:
+            estimate = await table_row_estimate(db, Contact.__table__)
+        else:
+            estimate = await planner_row_estimate(db, select(Contact.id).where(criteria), params)
+        if estimate is not None:
+            return estimate, "estimate"
+    key = ("search", query) if query else ("all",)
+    if mode != "exact":
+        cached = contact_count_cache.get(key)
+        if cached is not None:
+            return cached, "cached"
+        mode = "cached"
 
-    today = date.today()
-    end_date = today + timedelta(days=7)
+    stmt = select(func.count()).select_from(Contact)
+    if criteria is not None:
+        stmt = stmt.where(criteria)
+    total = await db.scalar(stmt, params)
+    contact_count_cache.set(key, total)
+    return total, mode
 
-    start_doy = today.timetuple().tm_yday
-    end_doy = end_date.timetuple().tm_yday
 
-    stmt = select(Contact)
+def _birthday_window(today: date, days: int) -> Tuple[bool, dict]:
+    """
+    Returns whether a birthday window crosses the new year, and the month-day
+    keys bound by :func:`_birthday_segments`.
+
+    :param today: The first day of the window.
+    :param days: The number of days after ``today`` the window covers.
+    """
+    end_date = today + timedelta(days=days)
+    params = {"start_key": birthday_key(today), "end_key": birthday_key(end_date)}
+    return end_date.year != today.year, params
+
+
+def _birthday_segments(wraps: bool) -> List[ColumnElement[bool]]:
+    """
+    Splits a birthday window into month-day key ranges, in output order.
+
+    A window that crosses the new year becomes two ranges: from today to the end
+    of the year, then from the start of the year to the window end.
+
+    :param wraps: Whether the window crosses the new year, see :func:`_birthday_window`.
+    :return: One or two predicates on ``Contact.birthday_md``.
+    """
+    start_key = bindparam("start_key", type_=Contact.birthday_md.type)
+    end_key = bindparam("end_key", type_=Contact.birthday_md.type)
+    if not wraps:
+        return [Contact.birthday_md.between(start_key, end_key)]
+    return [
+        Contact.birthday_md >= start_key,
+        and_(Contact.birthday_md <= end_key, Contact.birthday_md < start_key),
+    ]
+
+
+BIRTHDAY_ORDER = (Contact.birthday_md, Contact.last_name, Contact.first_name, Contact.id)
+
+
+@functools.cache
+def _birthdays_statement(
+    fields: Optional[Tuple[str, ...]], wraps: bool, segment: int, after_cursor: bool
+) -> Select:
+    stmt = select(*_select_targets(fields, BIRTHDAY_ORDER)).where(_birthday_segments(wraps)[segment])
+    return _paged(stmt, BIRTHDAY_ORDER, "cursor" if after_cursor else "first")
+
+
+async def get_upcoming_birthdays(
+    db: AsyncSession,
+    days: int = 7,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Page[Union[Contact, dict]]:
+    """
+    Retrieves contacts with birthdays in the next ``days`` days.
+
+    The window is matched on the stored month-day key, so each part of it is an
+    index range scan on ``ix_contacts_birthday_md`` that is already in output
+    order (birthday, last name, first name).
+
+    :param db: The database session.
+    :param days: The size of the window in days, today included.
+    :param limit: The maximum number of contacts to return.
+    :param cursor: The opaque cursor returned with the previous page.
+    :param fields: Optional sparse fieldset, as in :func:`get_contacts`.
+    :return: The page of contacts with upcoming birthdays.
+    :raises InvalidCursorError: If the cursor is malformed.
+    """
+
+    wraps, window = _birthday_window(date.today(), days)
+    segments = 2 if wraps else 1
+    first_segment, after = 0, None
+    if cursor is not None:
+        first_segment, *after = decode_cursor(cursor, 5, (int, *column_types(BIRTHDAY_ORDER)))
+        if first_segment not in range(segments):
+            raise InvalidCursorError("Malformed cursor.")
+
+    fields_key = _fields_key(fields)
+    rows = []
+    for segment in range(first_segment, segments):
+        after_cursor = segment == first_segment and after is not None
+        stmt = _birthdays_statement(fields_key, wraps, segment, after_cursor)
+        params = {**window, **_paging_params(limit - len(rows), 0, after if after_cursor else None)}
+        result = await db.execute(stmt, params)
+        rows.extend((segment, row) for row in result.all())
+        if len(rows) > limit:
+            break
+
+    page = build_page(
+        rows, limit, lambda item: (item[0], *_sort_values(item[1], fields, BIRTHDAY_ORDER))
+    )
+    page.items = [row for _, row in page.items]
+    return _finish_page(page, fields)
+
+
+EXPORT_COLUMNS = (
+    Contact.id,
+    Contact.first_name,
+    Contact.last_name,
+    Contact.email,
+    Contact.phone,
+    Contact.birthday,
+    Contact.additional_data,
+)
+
+
+async def stream_contacts(
+    db: AsyncSession,
+    query: Optional[str] = None,
+    days: Optional[int] = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[Sequence[RowMapping]]:
+    """
+    Streams contacts ordered by ID from a server-side cursor, batch by batch.
+
+    Only ``batch_size`` rows are held in memory at a time, whatever the size of the
+    table. Plain column rows are fetched, so no ORM objects are built.
+
+    :param db: The database session; it must stay open while the stream is consumed.
+    :param query: Optional search query, matched like in :func:`search_contacts`.
+    :param days: Optional birthday window, matched like in :func:`get_upcoming_birthdays`.
+    :param batch_size: The number of rows fetched per round trip.
+    :return: An async iterator over batches of row mappings keyed by column name.
+    """
+
+    criteria, params = _filter_criteria(query, days)
+    stmt = select(*EXPORT_COLUMNS).where(*criteria)
+    stmt = stmt.order_by(Contact.id).execution_options(yield_per=batch_size)
+    result = await db.stream(stmt, params)
+    async for batch in result.mappings().partitions():
+        yield batch
+
+
+def _filter_criteria(
+    query: Optional[str], days: Optional[int]
+) -> Tuple[List[ColumnElement[bool]], dict]:
+    """
+    Returns the predicates and bind parameter values matching contacts like
+    :func:`search_contacts` (``query``) and :func:`get_upcoming_birthdays` (``days``).
+    """
+    criteria, params = [], {}
+    if query:
+        criteria.append(_search_filter(_is_short_query(query)))
+        params.update(_search_params(query))
+    if days is not None:
+        wraps, window = _birthday_window(date.today(), days)
+        criteria.append(or_(*_birthday_segments(wraps)))
+        params.update(window)
+    return criteria, params
+
+
+def _id_list_match(db: AsyncSession) -> ColumnElement[bool]:
+    """
+    Matches ``Contact.id`` against the ``ids`` bind parameter, as one array
+    parameter on PostgreSQL.
+    """
+    if _dialect_name(db) == "postgresql":
+        return Contact.id == any_(bindparam("ids", type_=postgresql.ARRAY(Integer)))
+    return Contact.id.in_(bindparam("ids", expanding=True))
 
-    if start_doy <= end_doy:
-        stmt = stmt.where(
-            and_(
-                extract("doy", Contact.birthday) >= start_doy,
-                extract("doy", Contact.birthday) <= end_doy,
+
+async def _bulk_apply(
+    db: AsyncSession,
+    values: Optional[dict],
+    contact_ids: Optional[Sequence[int]],
+    query: Optional[str],
+    days: Optional[int],
+    max_rows: int,
+    batch_size: int,
+) -> List[int]:
+    """
+    Runs a set-based ``UPDATE``/``DELETE ... RETURNING id, email`` over the
+    selected contacts, ``batch_size`` rows per statement.
+
+    Contacts are selected by ID, or by filter. A filter is first counted, and
+    the batches walk the matching IDs up to the highest one counted, so rows
+    added meanwhile are left alone and the limit holds. All batches run in the
+    caller's transaction.
+
+    :param values: The column values to set, or None to delete the contacts.
+    :return: The IDs of the changed contacts.
+    :raises BulkLimitError: If more than ``max_rows`` contacts are selected.
+    """
+    async def run_batch(criteria: ColumnElement[bool], params: dict) -> List[Tuple[int, str]]:
+        if values is None:
+            stmt = delete(Contact)
+        else:
+            stmt = update(Contact).values(
+                **values,
+                version=Contact.version + 1,
+                change_seq=await _next_change_seq(db),
+                updated_at=_change_time(db),
             )
+        stmt = (
+            stmt.where(criteria)
+            .returning(Contact.id, Contact.email)
+            .execution_options(synchronize_session=False)
         )
+        rows = (await db.execute(stmt, params)).tuples().all()
+        if values is None:
+            await _record_tombstones(db, [contact_id for contact_id, _ in rows])
+        return rows
+
+    changed: List[Tuple[int, str]] = []
+    if contact_ids is not None:
+        contact_ids = list(dict.fromkeys(contact_ids))
+        if len(contact_ids) > max_rows:
+            raise BulkLimitError(f"At most {max_rows} contacts can be changed at once.")
+        for start in range(0, len(contact_ids), batch_size):
+            changed.extend(
+                await run_batch(_id_list_match(db), {"ids": contact_ids[start:start + batch_size]})
+            )
     else:
-        stmt = stmt.where(
-            or_(
-                extract("doy", Contact.birthday) >= start_doy,
-                extract("doy", Contact.birthday) <= end_doy,
+        criteria, params = _filter_criteria(query, days)
+        matched, upper = (await db.execute(
+            select(func.count(), func.max(Contact.id)).where(*criteria), params
+        )).one()
+        if matched > max_rows:
+            raise BulkLimitError(
+                f"The filter matches {matched} contacts; at most {max_rows} can be changed at once."
             )
+        batch = (
+            select(Contact.id)
+            .where(
+                *criteria,
+                Contact.id > bindparam("after", type_=Integer),
+                Contact.id <= bindparam("upper", type_=Integer),
+            )
+            .order_by(Contact.id)
+            .limit(batch_size)
         )
+        criteria = Contact.id.in_(batch.scalar_subquery())
+        after = 0
+        while matched:
+            rows = await run_batch(criteria, {**params, "after": after, "upper": upper})
+            changed.extend(rows)
+            if len(rows) < batch_size:
+                break
+            after = max(contact_id for contact_id, _ in rows)
 
-    stmt = stmt.order_by(extract("doy", Contact.birthday), Contact.last_name, Contact.first_name)
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
\ No newline at end of file
+    if changed:
+        await _invalidate_on_commit(db, changed)
+    return [contact_id for contact_id, _ in changed]
+
+
+async def bulk_update_contacts(
+    changes: ContactBulkChanges,
+    db: AsyncSession,
+    contact_ids: Optional[Sequence[int]] = None,
+    query: Optional[str] = None,
+    days: Optional[int] = None,
+    max_rows: int = 10_000,
+    batch_size: int = 1000,
+) -> List[int]:
+    """
+    Sets the same fields on many contacts with set-based ``UPDATE`` statements.
+
+    Versions are incremented and ``updated_at`` is set, like :func:`update_contact`.
+
+    :param changes: The fields to set; email and phone cannot be changed in bulk.
+    :param db: The database session.
+    :param contact_ids: The contacts to update, or None to select them by filter.
+    :param query: Search filter, matched like in :func:`search_contacts`.
+    :param days: Birthday window, matched like in :func:`get_upcoming_birthdays`.
+    :param max_rows: The most contacts that may be selected.
+    :param batch_size: The most contacts updated per statement.
+    :return: The IDs of the updated contacts.
+    :raises BulkLimitError: If more than ``max_rows`` contacts are selected.
+    """
+    values = _with_derived_columns(changes.model_dump(exclude_unset=True))
+    return await _bulk_apply(db, values, contact_ids, query, days, max_rows, batch_size)
+
+
+async def bulk_remove_contacts(
+    db: AsyncSession,
+    contact_ids: Optional[Sequence[int]] = None,
+    query: Optional[str] = None,
+    days: Optional[int] = None,
+    max_rows: int = 10_000,
+    batch_size: int = 1000,
+) -> List[int]:
+    """
+    Removes many contacts with set-based ``DELETE`` statements.
+
+    Takes the same selection as :func:`bulk_update_contacts`, and records a
+    tombstone for every removed contact like :func:`remove_contact`.
+
+    :return: The IDs of the removed contacts.
+    :raises BulkLimitError: If more than ``max_rows`` contacts are selected.
+    """
+    return await _bulk_apply(db, None, contact_ids, query, days, max_rows, batch_size)
+
+
+# Key columns of each kind of duplicate, in group order.
+DUPLICATE_KEYS = {
+    "email": (Contact.email_key,),
+    "phone": (Contact.phone_key,),
+    "name": (Contact.last_name_key, Contact.first_name_key),
+}
+
+
+@dataclass
+class DuplicateGroup:
+    """Contacts sharing the same normalized key, ordered by ID."""
+    key: Tuple[str, ...]
+    contacts: List[Contact] = field(default_factory=list)
+
+
+@functools.cache
+def _duplicates_statement(by: str, after_cursor: bool) -> Select:
+    keys = DUPLICATE_KEYS[by]
+    groups = select(*keys).where(*(key != "" for key in keys))
+    if after_cursor:
+        groups = groups.where(keyset_after_params(keys))
+    groups = (
+        groups.group_by(*keys)
+        .having(func.count() > 1)
+        .order_by(*keys)
+        .limit(LIMIT)
+        .subquery("duplicate_groups")
+    )
+    return (
+        select(Contact)
+        .join(groups, and_(*(key == groups.c[key.key] for key in keys)))
+        .order_by(*keys, Contact.id)
+    )
+
+
+async def find_duplicates(
+    db: AsyncSession,
+    by: str = "email",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Page[DuplicateGroup]:
+    """
+    Retrieves a page of duplicate groups: contacts whose normalized email, phone
+    or name (see ``src.database.models``) is the same.
+
+    The keys are grouped in one pass over their index, and the members of the
+    page's groups are joined back on the same index, so the cost grows with the
+    table size and not with its square. Groups are ordered by key.
+
+    :param db: The database session.
+    :param by: ``email``, ``phone`` or ``name`` (keys of ``DUPLICATE_KEYS``).
+    :param limit: The maximum number of groups to return.
+    :param cursor: The opaque cursor returned with the previous page.
+    :return: The page of groups and the cursor of the next page.
+    :raises InvalidCursorError: If the cursor is malformed.
+    """
+    keys = DUPLICATE_KEYS[by]
+    cursor_values = decode_cursor(cursor, len(keys), column_types(keys)) if cursor is not None else None
+    params = _paging_params(limit, 0, cursor_values)
+    result = await db.execute(_duplicates_statement(by, cursor is not None), params)
+    groups: List[DuplicateGroup] = []
+    for contact in result.scalars():
+        key = tuple(getattr(contact, column.key) for column in keys)
+        if not groups or groups[-1].key != key:
+            groups.append(DuplicateGroup(key))
+        groups[-1].contacts.append(contact)
+    return build_page(groups, limit, lambda group: group.key)
+
+
+@dataclass
+class ContactChange:
+    """
+    One entry of the change feed: ``op`` is ``created``, ``updated`` or
+    ``deleted``; ``contact`` is the current state, None for deletions.
+    """
+    op: str
+    contact_id: int
+    contact: Optional[Contact] = None
+
+
+@dataclass
+class ChangeBatch:
+    """
+    A page of the change feed. ``cursor`` points after its last change and is
+    always set, so the next call can resume from it; ``has_more`` tells whether
+    more changes were already available.
+    """
+    changes: List[ContactChange] = field(default_factory=list)
+    cursor: str = ""
+    has_more: bool = False
+
+
+# Position of a contact in the change feed, as encoded in its cursor.
+CHANGE_ORDER = (Contact.change_seq, Contact.id)
+
+
+async def _change_horizon(
+    db: AsyncSession, position: Tuple[int, int], cutoff: datetime, limit: int
+) -> Optional[int]:
+    """
+    Returns the lowest ``change_seq`` written after ``cutoff`` among the next
+    ``limit + 1`` changes of each table after ``position``, or None.
+
+    Sequence values are taken in one order and committed in another, so a
+    change younger than the safety lag may still be preceded by one not
+    committed yet. The feed stops before such changes until they are old enough.
+    Only the changes that could make the page are checked, so the cost does not
+    grow with the part of the feed still ahead.
+    """
+    horizons = []
+    for model, id_column, changed_at in (
+        (Contact, Contact.id, Contact.updated_at),
+        (ContactTombstone, ContactTombstone.contact_id, ContactTombstone.deleted_at),
+    ):
+        candidates = (
+            select(model.change_seq.label("change_seq"), changed_at.label("changed_at"))
+            .where(keyset_after([model.change_seq, id_column], position))
+            .order_by(model.change_seq, id_column)
+            .limit(limit + 1)
+            .subquery()
+        )
+        horizons.append(await db.scalar(
+            select(func.min(candidates.c.change_seq)).where(candidates.c.changed_at > cutoff)
+        ))
+    horizons = [horizon for horizon in horizons if horizon is not None]
+    return min(horizons) if horizons else None
+
+
+async def get_changes(
+    db: AsyncSession,
+    since: Optional[str] = None,
+    limit: int = 100,
+    safety_lag: float = 5.0,
+) -> ChangeBatch:
+    """
+    Returns the contacts created, updated or deleted since a change feed cursor.
+
+    Changes are ordered by their position in the feed (``change_seq``, then ID);
+    a contact changed several times appears once, at its latest change. Every
+    query reads at most ``limit + 1`` rows of an index range scan on
+    ``change_seq`` per table, so a call costs in proportion to ``limit``, not
+    to the table size or the changes still ahead. Without ``since``
+    the feed starts from the beginning, which is a full snapshot plus the
+    deletions on record.
+
+    :param db: The database session.
+    :param since: The cursor returned by the previous call.
+    :param limit: The maximum number of changes to return.
+    :param safety_lag: Changes younger than this many seconds are held back;
+        it must exceed the duration of the longest write transaction.
+    :return: The changes and the cursor to resume from.
+    :raises InvalidCursorError: If the cursor is malformed.
+    """
+    position = decode_cursor(since, 2, column_types(CHANGE_ORDER)) if since else (0, 0)
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=safety_lag)
+    horizon = await _change_horizon(db, position, cutoff, limit)
+
+    entries = []
+    for model, id_column, changed_at in (
+        (Contact, Contact.id, Contact.updated_at),
+        (ContactTombstone, ContactTombstone.contact_id, ContactTombstone.deleted_at),
+    ):
+        stmt = select(model).where(
+            keyset_after([model.change_seq, id_column], position), changed_at <= cutoff
+        )
+        if horizon is not None:
+            stmt = stmt.where(model.change_seq < horizon)
+        stmt = stmt.order_by(model.change_seq, id_column).limit(limit + 1)
+        for row in (await db.execute(stmt)).scalars():
+            if isinstance(row, Contact):
+                change = ContactChange("created" if row.version == 1 else "updated", row.id, row)
+            else:
+                change = ContactChange("deleted", row.contact_id)
+            entries.append(((row.change_seq, change.contact_id), change))
+
+    entries.sort(key=lambda entry: entry[0])
+    page = entries[:limit]
+    if page:
+        position = page[-1][0]
+    return ChangeBatch(
+        changes=[change for _, change in page],
+        cursor=encode_cursor(position),
+        has_more=len(entries) > limit,
+    )
+
+
+async def prime_statements(db: AsyncSession) -> None:
+    """
+    Runs the hot read queries once, without caring about their results.
+
+    Used to warm up pooled connections at startup: SQLAlchemy compiles and
+    caches each statement, and asyncpg prepares it on the connection.
+
+    :param db: A session bound to the connection to warm up.
+    """
+    await get_contacts(0, 1, db)
+    await get_contacts(0, 1, db, fields=list(FIELD_COLUMNS))
+    await _fetch_contact_by_id(0, db)
+    await get_upcoming_birthdays(db, limit=1)
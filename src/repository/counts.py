@@ -0,0 +1,61 @@
+import json
+from typing import Any, Mapping, Optional
+
+from sqlalchemy import Table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable, Select
+
+
+class Explain(Executable, ClauseElement):
+    """
+    ``EXPLAIN (FORMAT JSON)`` of a statement, with its parameters bound as usual.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kwargs: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kwargs)
+
+
+async def planner_row_estimate(
+    db: AsyncSession, statement: Select, params: Optional[Mapping[str, Any]] = None
+) -> int:
+    """
+    Returns the number of rows the PostgreSQL planner expects ``statement`` to return.
+
+    The statement is planned but not run, so the cost does not depend on the
+    table size. The estimate comes from table statistics and can be far off for
+    selective filters.
+
+    :param db: A session bound to PostgreSQL.
+    :param statement: The query to estimate, without ``LIMIT``.
+    :param params: Values of the statement's bind parameters.
+    :return: The estimated number of rows.
+    """
+    plan = await db.scalar(Explain(statement), params)
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def table_row_estimate(db: AsyncSession, table: Table) -> Optional[int]:
+    """
+    Returns ``pg_class.reltuples`` of a table, kept up to date by (auto)vacuum
+    and ANALYZE.
+
+    :param db: A session bound to PostgreSQL.
+    :param table: The table to estimate.
+    :return: The estimated row count, or None if the table was never analyzed.
+    """
+    estimate = await db.scalar(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table.name},
+    )
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
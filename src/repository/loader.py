@@ -0,0 +1,84 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Mapping, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    Coalesces concurrent single-key lookups into batched calls (the dataloader
+    pattern).
+
+    Keys requested during the same event-loop iteration are collected and fetched
+    with one call to ``batch_fn``, scheduled right after that iteration. A key
+    that is already pending or being fetched is not requested again: all its
+    callers share one result.
+
+    :param batch_fn: Fetches many keys at once and returns the values found,
+        keyed by key; missing keys resolve to None.
+    :param max_batch_size: Larger batches are split into several calls.
+    """
+    def __init__(
+        self,
+        batch_fn: Callable[[List[K]], Awaitable[Mapping[K, V]]],
+        max_batch_size: int = 500,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[K, asyncio.Future] = {}
+        self._in_flight: Dict[K, asyncio.Future] = {}
+        # The loop only keeps weak references to tasks; these keep batches alive.
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.loads = 0
+
+    def _future_for(self, key: K) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures belong to one loop; start over if the loader is reused on another.
+            self._loop, self._pending, self._in_flight, self._tasks = loop, {}, {}, set()
+        future = self._pending.get(key) or self._in_flight.get(key)
+        if future is None:
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) == 1:
+                loop.call_soon(self._dispatch)
+        return future
+
+    async def load(self, key: K) -> Optional[V]:
+        """
+        Returns the value of ``key``, fetched together with concurrent lookups.
+        """
+        self.loads += 1
+        # Shielded, so a cancelled caller does not cancel the lookup for the others.
+        return await asyncio.shield(self._future_for(key))
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._in_flight.update(pending)
+        keys = list(pending)
+        for start in range(0, len(keys), self.max_batch_size):
+            batch = {key: pending[key] for key in keys[start:start + self.max_batch_size]}
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[K, asyncio.Future]) -> None:
+        self.batches += 1
+        try:
+            values = await self.batch_fn(list(batch))
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(values.get(key))
+        finally:
+            for key in batch:
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"loads": self.loads, "batches": self.batches, "in_flight": len(self._in_flight)}
@@ -0,0 +1,562 @@
+import bisect
+import hashlib
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from src.database.models import Contact, birthday_key
+from src.repository.base import ContactRepository
+from src.repository.contacts import (
+    BIRTHDAY_ORDER,
+    CHANGE_ORDER,
+    DUPLICATE_KEYS,
+    EXPORT_COLUMNS,
+    LIST_ORDER,
+    RANK_TIER_SIZE,
+    TRIGRAM_MIN_LENGTH,
+    BulkLimitError,
+    ChangeBatch,
+    ContactChange,
+    ContactConflictError,
+    DuplicateGroup,
+    StaleContactError,
+    _birthday_window,
+    _is_short_query,
+    _with_derived_columns,
+)
+from src.repository.pagination import (
+    InvalidCursorError,
+    Page,
+    build_page,
+    column_types,
+    decode_cursor,
+    encode_cursor,
+)
+from src.schemas import ContactBulkChanges, ContactCreate, ContactUpdate
+
+# Every month-day key of a leap year, in calendar order.
+MONTH_DAYS = tuple(birthday_key(date.fromordinal(day)) for day in range(
+    date(2000, 1, 1).toordinal(), date(2001, 1, 1).toordinal()
+))
+# Columns that must not be set to None, as the NOT NULL constraints enforce in the database.
+REQUIRED_COLUMNS = tuple(column.key for column in Contact.__table__.columns if not column.nullable)
+
+
+class ContactRecord:
+    """
+    One contact held in memory, with the attributes of ``Contact``.
+
+    Records are never changed in place; a write swaps in a new record, so a
+    record that was handed out stays a consistent snapshot.
+    """
+    __slots__ = tuple(column.key for column in Contact.__table__.columns)
+
+    def __init__(self, **values: Any):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def replace(self, **changes: Any) -> "ContactRecord":
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return ContactRecord(**values)
+
+
+def _search_values(record: ContactRecord) -> Tuple[str, str, str]:
+    # The lower-cased fields matched by a search, as `SEARCH_COLUMNS`.
+    return record.first_name.lower(), record.last_name.lower(), record.email.lower()
+
+
+def _keyset_start(keys: Sequence, after: Any) -> int:
+    """Returns the position of the first key after a decoded cursor."""
+    try:
+        return bisect.bisect_right(keys, after)
+    except TypeError as exc:
+        raise InvalidCursorError("Malformed cursor.") from exc
+
+
+def _finish_page(page: Page[ContactRecord], fields: Optional[Sequence[str]]) -> Page[Union[ContactRecord, dict]]:
+    version_tag = hashlib.sha1(
+        ",".join(f"{record.id}.{record.version}" for record in page.items).encode()
+    ).hexdigest()
+    items = page.items if fields is None else [
+        {name: getattr(record, name) for name in fields} for record in page.items
+    ]
+    return Page(items=items, next_cursor=page.next_cursor, version_tag=version_tag)
+
+
+class InMemoryContactRepository(ContactRepository):
+    """
+    A process-wide contact store kept in memory, for DB-free tests and for
+    serving a read-mostly copy of the contacts without database round trips.
+
+    Every operation of the database backend is supported with the same results,
+    ordering and cursors, served by in-memory indexes instead of table scans:
+
+    * hash indexes on ID, email and phone (the unique columns);
+    * the IDs in ascending order, for list pages and exports;
+    * a bucket per month-day key, for the upcoming-birthdays window;
+    * trigram postings over the lower-cased names and email for substring
+      search, and the one- and two-character prefixes for shorter queries;
+    * a bucket per normalized duplicate key.
+
+    Records use ``__slots__``, so a contact costs no per-instance dictionary.
+    All writes run without awaiting, so each is atomic for the other requests
+    of the event loop. Nothing is persisted: the contacts last as long as the
+    process.
+    """
+    def __init__(self):
+        self._by_id: Dict[int, ContactRecord] = {}
+        self._ids: List[int] = []
+        self._by_email: Dict[str, int] = {}
+        self._by_phone: Dict[str, int] = {}
+        self._birthdays: Dict[int, Set[int]] = defaultdict(set)
+        self._trigrams: Dict[str, Set[int]] = defaultdict(set)
+        self._prefixes: Dict[str, Set[int]] = defaultdict(set)
+        self._duplicates: Dict[str, Dict[tuple, Set[int]]] = {by: defaultdict(set) for by in DUPLICATE_KEYS}
+        # Keys shared by more than one contact, per kind of duplicate.
+        self._duplicate_keys: Dict[str, Set[tuple]] = {by: set() for by in DUPLICATE_KEYS}
+        # Change feed: the (change_seq, id) of the latest change of every
+        # contact, and the same keys sorted, which may still hold superseded ones.
+        self._feed: Set[Tuple[int, int]] = set()
+        self._feed_keys: List[Tuple[int, int]] = []
+        self._tombstones: Dict[int, int] = {}
+        self._next_id = 1
+        self._change_seq = 0
+
+    # Indexes
+
+    def _index(self, record: ContactRecord) -> None:
+        self._by_id[record.id] = record
+        self._by_email[record.email] = record.id
+        self._by_phone[record.phone] = record.id
+        self._birthdays[record.birthday_md].add(record.id)
+        for value in _search_values(record):
+            self._prefixes[value[:1]].add(record.id)
+            self._prefixes[value[:2]].add(record.id)
+            for start in range(len(value) - TRIGRAM_MIN_LENGTH + 1):
+                self._trigrams[value[start:start + TRIGRAM_MIN_LENGTH]].add(record.id)
+        for by, columns in DUPLICATE_KEYS.items():
+            key = tuple(getattr(record, column.key) for column in columns)
+            if all(key):
+                members = self._duplicates[by][key]
+                members.add(record.id)
+                if len(members) > 1:
+                    self._duplicate_keys[by].add(key)
+        self._feed.add((record.change_seq, record.id))
+        self._feed_keys.append((record.change_seq, record.id))
+
+    def _unindex(self, record: ContactRecord) -> None:
+        del self._by_id[record.id]
+        del self._by_email[record.email]
+        del self._by_phone[record.phone]
+        self._discard(self._birthdays, record.birthday_md, record.id)
+        for value in _search_values(record):
+            self._discard(self._prefixes, value[:1], record.id)
+            self._discard(self._prefixes, value[:2], record.id)
+            for start in range(len(value) - TRIGRAM_MIN_LENGTH + 1):
+                self._discard(self._trigrams, value[start:start + TRIGRAM_MIN_LENGTH], record.id)
+        for by, columns in DUPLICATE_KEYS.items():
+            key = tuple(getattr(record, column.key) for column in columns)
+            if all(key):
+                self._discard(self._duplicates[by], key, record.id)
+                if len(self._duplicates[by].get(key, ())) < 2:
+                    self._duplicate_keys[by].discard(key)
+        self._feed.discard((record.change_seq, record.id))
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[int]], key: Any, contact_id: int) -> None:
+        members = index.get(key)
+        if members is not None:
+            members.discard(contact_id)
+            if not members:
+                del index[key]
+
+    def _next_change_seq(self) -> int:
+        self._change_seq += 1
+        return self._change_seq
+
+    def _compact_feed(self) -> None:
+        # Superseded keys are skipped on read and dropped once they outnumber
+        # the live ones.
+        if len(self._feed_keys) > 2 * len(self._feed) + 64:
+            self._feed_keys = sorted(self._feed)
+
+    def _insert(self, data: dict) -> Optional[ContactRecord]:
+        if data["email"] in self._by_email or data["phone"] in self._by_phone:
+            return None
+        contact_id = self._next_id
+        self._next_id += 1
+        record = ContactRecord(
+            **data,
+            id=contact_id,
+            version=1,
+            updated_at=datetime.now(timezone.utc),
+            change_seq=self._next_change_seq(),
+        )
+        self._index(record)
+        bisect.insort(self._ids, record.id)
+        return record
+
+    def _update(self, record: ContactRecord, data: dict) -> ContactRecord:
+        # `ContactUpdate` rejects these; like a NOT NULL violation, this is not a conflict.
+        for name in REQUIRED_COLUMNS:
+            if name in data and data[name] is None:
+                raise ValueError(f"`{name}` cannot be null.")
+        for column, index in (("email", self._by_email), ("phone", self._by_phone)):
+            if column in data and index.get(data[column], record.id) != record.id:
+                raise ContactConflictError("Contact with this email or phone already exists.")
+        updated = record.replace(
+            **data,
+            version=record.version + 1,
+            updated_at=datetime.now(timezone.utc),
+            change_seq=self._next_change_seq(),
+        )
+        self._unindex(record)
+        self._index(updated)
+        self._compact_feed()
+        return updated
+
+    def _delete(self, record: ContactRecord) -> None:
+        self._unindex(record)
+        del self._ids[bisect.bisect_left(self._ids, record.id)]
+        change_seq = self._next_change_seq()
+        self._tombstones[record.id] = change_seq
+        self._feed.add((change_seq, record.id))
+        self._feed_keys.append((change_seq, record.id))
+        self._compact_feed()
+
+    def load(self, contacts: Iterable[Any]) -> int:
+        """
+        Adds existing contacts, e.g. ``Contact`` rows read from the database,
+        keeping their IDs, versions and change positions.
+
+        :param contacts: Objects with the attributes of ``Contact``.
+        :return: The number of contacts added; clashing ones are skipped.
+        """
+        loaded = 0
+        for contact in contacts:
+            data = {name: getattr(contact, name) for name in ContactRecord.__slots__}
+            if data["id"] in self._by_id or data["email"] in self._by_email or data["phone"] in self._by_phone:
+                continue
+            record = ContactRecord(**_with_derived_columns(data))
+            self._change_seq = max(self._change_seq, record.change_seq)
+            self._next_id = max(self._next_id, record.id + 1)
+            self._index(record)
+            bisect.insort(self._ids, record.id)
+            loaded += 1
+        self._feed_keys.sort()
+        return loaded
+
+    # Selections
+
+    def _search_ids(self, query: str) -> Set[int]:
+        lowered = query.lower()
+        if _is_short_query(query):
+            candidates = self._prefixes.get(lowered[:2], set())
+            return {
+                contact_id for contact_id in candidates
+                if any(value.startswith(lowered) for value in _search_values(self._by_id[contact_id]))
+            }
+        postings = sorted(
+            (
+                self._trigrams.get(lowered[start:start + TRIGRAM_MIN_LENGTH], set())
+                for start in range(len(lowered) - TRIGRAM_MIN_LENGTH + 1)
+            ),
+            key=len,
+        )
+        candidates = postings[0].intersection(*postings[1:]) if postings else set()
+        # Trigrams may come from different fields; check the substring itself.
+        return {
+            contact_id for contact_id in candidates
+            if any(lowered in value for value in _search_values(self._by_id[contact_id]))
+        }
+
+    @staticmethod
+    def _window_segments(days: int) -> List[List[int]]:
+        # The month-day keys of each part of the window, as `_birthday_segments`.
+        wraps, window = _birthday_window(date.today(), days)
+        start, end = window["start_key"], window["end_key"]
+        if not wraps:
+            return [[key for key in MONTH_DAYS if start <= key <= end]]
+        return [
+            [key for key in MONTH_DAYS if key >= start],
+            [key for key in MONTH_DAYS if key <= end and key < start],
+        ]
+
+    def _selected_ids(self, query: Optional[str], days: Optional[int]) -> Optional[Set[int]]:
+        """
+        Returns the IDs matching a search query and a birthday window, like
+        ``_filter_criteria``, or None when there is no filter.
+        """
+        selected = None
+        if query:
+            selected = self._search_ids(query)
+        if days is not None:
+            in_window = set()
+            for segment in self._window_segments(days):
+                for key in segment:
+                    in_window.update(self._birthdays.get(key, ()))
+            selected = in_window if selected is None else selected & in_window
+        return selected
+
+    def _paged(
+        self,
+        ordered: Sequence[Tuple[tuple, ContactRecord]],
+        key_types: Sequence[type],
+        skip: int,
+        limit: int,
+        cursor: Optional[str],
+        fields: Optional[Sequence[str]],
+    ) -> Page:
+        """Pages sorted ``(sort key, record)`` pairs by offset or keyset cursor."""
+        start = skip
+        if cursor is not None:
+            after = decode_cursor(cursor, len(key_types), key_types)
+            start = _keyset_start([key for key, _ in ordered], after)
+        page = build_page(ordered[start:start + limit + 1], limit, lambda item: item[0])
+        page.items = [record for _, record in page.items]
+        return _finish_page(page, fields)
+
+    # ContactRepository
+
+    async def create_contact(self, body: ContactCreate) -> ContactRecord:
+        record = self._insert(_with_derived_columns(body.model_dump()))
+        if record is None:
+            raise ContactConflictError("Contact with this email or phone already exists.")
+        return record
+
+    async def bulk_insert_contacts(self, bodies: List[ContactCreate]) -> Set[str]:
+        inserted = set()
+        for body in bodies:
+            record = self._insert(_with_derived_columns(body.model_dump()))
+            if record is not None:
+                inserted.add(record.email)
+        return inserted
+
+    async def get_contacts(
+        self,
+        skip: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        start = skip
+        if cursor is not None:
+            start = _keyset_start(self._ids, decode_cursor(cursor, 1, column_types(LIST_ORDER))[0])
+        records = [self._by_id[contact_id] for contact_id in self._ids[start:start + limit + 1]]
+        return _finish_page(build_page(records, limit, lambda record: (record.id,)), fields)
+
+    async def get_contact_by_id(self, contact_id: int) -> Optional[ContactRecord]:
+        return self._by_id.get(contact_id)
+
+    async def get_contact_by_email(self, email: str) -> Optional[ContactRecord]:
+        contact_id = self._by_email.get(email)
+        return None if contact_id is None else self._by_id[contact_id]
+
+    async def get_contacts_by_ids(self, contact_ids: Sequence[int]) -> List[ContactRecord]:
+        return [
+            self._by_id[contact_id] for contact_id in dict.fromkeys(contact_ids) if contact_id in self._by_id
+        ]
+
+    def _check_version(self, contact_id: int, expected_versions: Optional[Sequence[int]]) -> Optional[ContactRecord]:
+        record = self._by_id.get(contact_id)
+        if record is not None and expected_versions is not None and record.version not in expected_versions:
+            raise StaleContactError("Contact has been modified.")
+        return record
+
+    async def update_contact(
+        self,
+        contact_id: int,
+        body: ContactUpdate,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> Optional[ContactRecord]:
+        record = self._check_version(contact_id, expected_versions)
+        data = _with_derived_columns(body.model_dump(exclude_unset=True))
+        if record is None or not data:
+            return record
+        return self._update(record, data)
+
+    async def remove_contact(
+        self, contact_id: int, expected_versions: Optional[Sequence[int]] = None
+    ) -> Optional[ContactRecord]:
+        record = self._check_version(contact_id, expected_versions)
+        if record is not None:
+            self._delete(record)
+        return record
+
+    async def search_contacts(
+        self,
+        query: str,
+        skip: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        lowered = query.lower()
+        ordered = []
+        for contact_id in self._search_ids(query):
+            record = self._by_id[contact_id]
+            values = _search_values(record)
+            if lowered in values:
+                tier = 3
+            elif any(value.startswith(lowered) for value in values):
+                tier = 2
+            else:
+                tier = 1
+            ordered.append(((-tier * RANK_TIER_SIZE, record.id), record))
+        ordered.sort(key=lambda item: item[0])
+        return self._paged(ordered, (int, *column_types(LIST_ORDER)), skip, limit, cursor, fields)
+
+    async def count_contacts(self, query: Optional[str] = None, mode: str = "cached") -> Tuple[int, str]:
+        # Counting is as cheap as an estimate here, so the count is always exact.
+        total = len(self._search_ids(query)) if query else len(self._by_id)
+        return total, "exact"
+
+    async def get_upcoming_birthdays(
+        self,
+        days: int = 7,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        segments = self._window_segments(days)
+        first_segment, after = 0, None
+        if cursor is not None:
+            first_segment, *after = decode_cursor(cursor, 5, (int, *column_types(BIRTHDAY_ORDER)))
+            if first_segment not in range(len(segments)):
+                raise InvalidCursorError("Malformed cursor.")
+            after = (first_segment, *after)
+
+        rows: List[Tuple[tuple, ContactRecord]] = []
+        try:
+            for segment in range(first_segment, len(segments)):
+                for key in segments[segment]:
+                    if after is not None and (segment, key) < after[:2]:
+                        continue
+                    bucket = sorted(
+                        (
+                            ((segment, key, record.last_name, record.first_name, record.id), record)
+                            for record in (self._by_id[contact_id] for contact_id in self._birthdays.get(key, ()))
+                        ),
+                        key=lambda item: item[0],
+                    )
+                    rows.extend(item for item in bucket if after is None or item[0] > after)
+                    if len(rows) > limit:
+                        break
+                if len(rows) > limit:
+                    break
+        except TypeError as exc:
+            raise InvalidCursorError("Malformed cursor.") from exc
+        page = build_page(rows, limit, lambda item: item[0])
+        page.items = [record for _, record in page.items]
+        return _finish_page(page, fields)
+
+    async def stream_contacts(
+        self, query: Optional[str] = None, days: Optional[int] = None, batch_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        selected = self._selected_ids(query, days)
+        ids = self._ids if selected is None else sorted(selected)
+        after = 0
+        while True:
+            # Resumes after the last ID sent, as the stored IDs may change between batches.
+            start = bisect.bisect_right(ids, after)
+            if start >= len(ids):
+                return
+            chunk = ids[start:start + batch_size]
+            after = chunk[-1]
+            batch = [self._by_id[contact_id] for contact_id in chunk if contact_id in self._by_id]
+            if batch:
+                yield [{column.key: getattr(record, column.key) for column in EXPORT_COLUMNS} for record in batch]
+
+    def _bulk_selection(
+        self,
+        contact_ids: Optional[Sequence[int]],
+        query: Optional[str],
+        days: Optional[int],
+        max_rows: int,
+    ) -> List[ContactRecord]:
+        if contact_ids is not None:
+            contact_ids = list(dict.fromkeys(contact_ids))
+            if len(contact_ids) > max_rows:
+                raise BulkLimitError(f"At most {max_rows} contacts can be changed at once.")
+        else:
+            contact_ids = sorted(self._selected_ids(query, days) or ())
+            if len(contact_ids) > max_rows:
+                raise BulkLimitError(
+                    f"The filter matches {len(contact_ids)} contacts; at most {max_rows} can be changed at once."
+                )
+        return [self._by_id[contact_id] for contact_id in contact_ids if contact_id in self._by_id]
+
+    async def bulk_update_contacts(
+        self,
+        changes: ContactBulkChanges,
+        contact_ids: Optional[Sequence[int]] = None,
+        query: Optional[str] = None,
+        days: Optional[int] = None,
+        max_rows: int = 10_000,
+        batch_size: int = 1000,
+    ) -> List[int]:
+        values = _with_derived_columns(changes.model_dump(exclude_unset=True))
+        records = self._bulk_selection(contact_ids, query, days, max_rows)
+        return [self._update(record, values).id for record in records]
+
+    async def bulk_remove_contacts(
+        self,
+        contact_ids: Optional[Sequence[int]] = None,
+        query: Optional[str] = None,
+        days: Optional[int] = None,
+        max_rows: int = 10_000,
+        batch_size: int = 1000,
+    ) -> List[int]:
+        records = self._bulk_selection(contact_ids, query, days, max_rows)
+        for record in records:
+            self._delete(record)
+        return [record.id for record in records]
+
+    async def find_duplicates(self, by: str = "email", limit: int = 50, cursor: Optional[str] = None) -> Page:
+        keys = sorted(self._duplicate_keys[by])
+        start = 0
+        if cursor is not None:
+            start = _keyset_start(keys, decode_cursor(cursor, len(DUPLICATE_KEYS[by]), column_types(DUPLICATE_KEYS[by])))
+        groups = [
+            DuplicateGroup(key, [self._by_id[contact_id] for contact_id in sorted(self._duplicates[by][key])])
+            for key in keys[start:start + limit + 1]
+        ]
+        return build_page(groups, limit, lambda group: group.key)
+
+    async def get_changes(self, since: Optional[str] = None, limit: int = 100, safety_lag: float = 5.0) -> ChangeBatch:
+        # Writes are applied atomically, in change_seq order, so no change can
+        # show up behind one already returned and `safety_lag` is not needed.
+        position = decode_cursor(since, 2, column_types(CHANGE_ORDER)) if since else (0, 0)
+        start = _keyset_start(self._feed_keys, tuple(position))
+        entries: List[Tuple[Tuple[int, int], ContactChange]] = []
+        for change_seq, contact_id in self._feed_keys[start:]:
+            if (change_seq, contact_id) not in self._feed:
+                continue
+            record = self._by_id.get(contact_id)
+            if record is not None and record.change_seq == change_seq:
+                change = ContactChange("created" if record.version == 1 else "updated", contact_id, record)
+            else:
+                change = ContactChange("deleted", contact_id)
+            entries.append(((change_seq, contact_id), change))
+            if len(entries) > limit:
+                break
+        page = entries[:limit]
+        if page:
+            position = page[-1][0]
+        return ChangeBatch(
+            changes=[change for _, change in page],
+            cursor=encode_cursor(position),
+            has_more=len(entries) > limit,
+        )
+
+    async def commit(self) -> None:
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "contacts": len(self._by_id),
+            "tombstones": len(self._tombstones),
+            "trigrams": len(self._trigrams),
+            "birthday_buckets": len(self._birthdays),
+        }
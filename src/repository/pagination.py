@@ -0,0 +1,130 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, TypeVar
+
+from sqlalchemy import bindparam, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass
+class Page(Generic[T]):
+    """
+    A single page of results returned by keyset-paginated repository calls.
+
+    ``next_cursor`` is an opaque token pointing right after the last item of the
+    page, or ``None`` when there are no more results. ``version_tag`` changes
+    whenever a contact on the page is added, removed or updated, and is used to
+    derive the ETag of the page.
+    """
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    version_tag: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encodes the sort-key values of the last row of a page into an opaque cursor.
+
+    :param values: The sort-key values, in ``ORDER BY`` order.
+    :return: A URL-safe cursor string.
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int, types: Optional[Sequence[type]] = None) -> tuple:
+    """
+    Decodes a cursor produced by :func:`encode_cursor`.
+
+    Clients can forge cursors, so with ``types`` every value is checked before
+    it reaches a typed bind parameter (see :func:`column_types`).
+
+    :param cursor: The cursor string received from the client.
+    :param size: The number of sort keys the cursor must contain.
+    :param types: The expected type of each sort key.
+    :return: The sort-key values as a tuple.
+    :raises InvalidCursorError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorError("Malformed cursor.") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Malformed cursor.")
+    if types is not None:
+        for value, expected in zip(values, types):
+            # JSON booleans decode to bool, which is an int subclass.
+            if not isinstance(value, expected) or isinstance(value, bool):
+                raise InvalidCursorError("Malformed cursor.")
+    return tuple(values)
+
+
+def column_types(columns: Sequence[ColumnElement]) -> tuple:
+    """
+    Returns the Python types of sort-key columns, for :func:`decode_cursor`.
+    """
+    return tuple(column.type.python_type for column in columns)
+
+
+def keyset_after(columns: Sequence[ColumnElement], values: Sequence[Any]) -> ColumnElement:
+    """
+    Builds the keyset predicate selecting rows that sort strictly after ``values``.
+
+    All columns are expected to be ordered ascending. A row-value comparison is
+    used so that PostgreSQL can serve it with a single index range scan.
+
+    :param columns: The sort-key columns, in ``ORDER BY`` order.
+    :param values: The sort-key values of the last row seen.
+    :return: A SQL boolean expression.
+    """
+    if len(columns) == 1:
+        return columns[0] > values[0]
+    return tuple_(*columns) > tuple_(*values)
+
+
+def keyset_after_params(columns: Sequence[ColumnElement], prefix: str = "after") -> ColumnElement:
+    """
+    Same as :func:`keyset_after`, with bind parameters ``{prefix}_0``,
+    ``{prefix}_1``, ... in place of the values, so the statement can be built
+    once and reused for every cursor (see :func:`keyset_params`).
+
+    :param columns: The sort-key columns, in ``ORDER BY`` order.
+    :param prefix: The prefix of the bind parameter names.
+    :return: A SQL boolean expression.
+    """
+    params = [bindparam(f"{prefix}_{index}", type_=column.type) for index, column in enumerate(columns)]
+    return keyset_after(columns, params)
+
+
+def keyset_params(values: Sequence[Any], prefix: str = "after") -> Dict[str, Any]:
+    """
+    Returns the bind parameter values of a :func:`keyset_after_params` predicate.
+    """
+    return {f"{prefix}_{index}": value for index, value in enumerate(values)}
+
+
+def build_page(rows: Sequence[T], limit: int, key: Callable[[T], Sequence[Any]]) -> Page[T]:
+    """
+    Turns ``limit + 1`` fetched rows into a :class:`Page`.
+
+    The extra row only signals that another page exists; it is not returned.
+
+    :param rows: The rows fetched with ``LIMIT limit + 1``.
+    :param limit: The requested page size.
+    :param key: Returns the sort-key values of a row.
+    :return: The page with its ``next_cursor`` set when more rows are available.
+    """
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = encode_cursor(key(items[-1]))
+    return Page(items=items, next_cursor=next_cursor)
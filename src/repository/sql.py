@@ -0,0 +1,119 @@
+from typing import Any, AsyncIterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Contact
+from src.repository import contacts
+from src.repository.base import ContactRepository
+from src.repository.pagination import Page
+from src.schemas import ContactBulkChanges, ContactCreate, ContactUpdate
+
+
+class SqlAlchemyContactRepository(ContactRepository):
+    """
+    The database backend: the functions of ``src.repository.contacts``, bound
+    to one session.
+
+    :param db: The session of the unit of work; committing it is up to its owner,
+        except through :meth:`commit`.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_contact(self, body: ContactCreate) -> Contact:
+        return await contacts.create_contact(body, self.db)
+
+    async def bulk_insert_contacts(self, bodies: List[ContactCreate]) -> Set[str]:
+        return await contacts.bulk_insert_contacts(bodies, self.db)
+
+    async def get_contacts(
+        self,
+        skip: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        return await contacts.get_contacts(skip, limit, self.db, cursor=cursor, fields=fields)
+
+    async def get_contact_by_id(self, contact_id: int) -> Optional[Contact]:
+        return await contacts.get_contact_by_id(contact_id, self.db)
+
+    async def get_contact_by_email(self, email: str) -> Optional[Contact]:
+        return await contacts.get_contact_by_email(email, self.db)
+
+    async def get_contacts_by_ids(self, contact_ids: Sequence[int]) -> List[Contact]:
+        return await contacts.get_contacts_by_ids(contact_ids, self.db)
+
+    async def update_contact(
+        self,
+        contact_id: int,
+        body: ContactUpdate,
+        expected_versions: Optional[Sequence[int]] = None,
+    ) -> Optional[Contact]:
+        return await contacts.update_contact(contact_id, body, self.db, expected_versions=expected_versions)
+
+    async def remove_contact(
+        self, contact_id: int, expected_versions: Optional[Sequence[int]] = None
+    ) -> Optional[Contact]:
+        return await contacts.remove_contact(contact_id, self.db, expected_versions=expected_versions)
+
+    async def search_contacts(
+        self,
+        query: str,
+        skip: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        return await contacts.search_contacts(query, skip, limit, self.db, cursor=cursor, fields=fields)
+
+    async def count_contacts(self, query: Optional[str] = None, mode: str = "cached") -> Tuple[int, str]:
+        return await contacts.count_contacts(self.db, query=query, mode=mode)
+
+    async def get_upcoming_birthdays(
+        self,
+        days: int = 7,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        return await contacts.get_upcoming_birthdays(self.db, days=days, limit=limit, cursor=cursor, fields=fields)
+
+    def stream_contacts(
+        self, query: Optional[str] = None, days: Optional[int] = None, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Mapping[str, Any]]]:
+        return contacts.stream_contacts(self.db, query=query, days=days, batch_size=batch_size)
+
+    async def bulk_update_contacts(
+        self,
+        changes: ContactBulkChanges,
+        contact_ids: Optional[Sequence[int]] = None,
+        query: Optional[str] = None,
+        days: Optional[int] = None,
+        max_rows: int = 10_000,
+        batch_size: int = 1000,
+    ) -> List[int]:
+        return await contacts.bulk_update_contacts(
+            changes, self.db, contact_ids, query, days, max_rows, batch_size
+        )
+
+    async def bulk_remove_contacts(
+        self,
+        contact_ids: Optional[Sequence[int]] = None,
+        query: Optional[str] = None,
+        days: Optional[int] = None,
+        max_rows: int = 10_000,
+        batch_size: int = 1000,
+    ) -> List[int]:
+        return await contacts.bulk_remove_contacts(self.db, contact_ids, query, days, max_rows, batch_size)
+
+    async def find_duplicates(self, by: str = "email", limit: int = 50, cursor: Optional[str] = None) -> Page:
+        return await contacts.find_duplicates(self.db, by=by, limit=limit, cursor=cursor)
+
+    async def get_changes(
+        self, since: Optional[str] = None, limit: int = 100, safety_lag: float = 5.0
+    ) -> contacts.ChangeBatch:
+        return await contacts.get_changes(self.db, since=since, limit=limit, safety_lag=safety_lag)
+
+    async def commit(self) -> None:
+        await self.db.commit()
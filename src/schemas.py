@@ -1,6 +1,6 @@
 from datetime import date
-from typing import Optional
-from pydantic import BaseModel, Field, EmailStr, ConfigDict
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, EmailStr, ConfigDict, model_validator
 
 class ContactBase(BaseModel):
     """
@@ -37,6 +37,13 @@ class ContactUpdate(BaseModel):
     birthday: Optional[date]
     additional_data: Optional[str] = Field(default=None, max_length=255 )
 
+    @model_validator(mode="after")
+    def _reject_nulls(self):
+        for name in ("first_name", "last_name", "email", "phone", "birthday"):
+            if name in self.model_fields_set and getattr(self, name) is None:
+                raise ValueError(f"`{name}` cannot be null.")
+        return self
+
 class ContactResponse(ContactBase):
     """
     Pydantic model for the API response.
@@ -46,4 +53,136 @@ class ContactResponse(ContactBase):
     mapping the SQLAlchemy model fields to the Pydantic model.
     """
     id: int
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class BulkImportRowError(BaseModel):
+    """
+    Pydantic model describing why a single row of a bulk import was rejected.
+
+    `row` is the 1-based number of the data row in the uploaded file.
+    """
+    row: int
+    detail: str
+
+class BulkImportReport(BaseModel):
+    """
+    Pydantic model for the result of a bulk import.
+
+    `errors` holds at most `BULK_IMPORT_MAX_ERRORS` entries; `errors_truncated`
+    tells whether more rows failed than are listed.
+    """
+    received: int
+    inserted: int
+    failed: int
+    errors: List[BulkImportRowError]
+    errors_truncated: bool = False
+
+class ContactBatchRequest(BaseModel):
+    """
+    Pydantic model for looking up many contacts by ID in one request.
+
+    At most `CONTACT_BATCH_MAX_IDS` distinct IDs are accepted.
+    """
+    ids: List[int] = Field(min_length=1)
+
+class ContactFilter(BaseModel):
+    """
+    Pydantic model selecting contacts with the predicates of the list endpoints.
+
+    `query` matches like `GET /search/` and `days` like `GET /birthdays/`; when
+    both are given, contacts must match both.
+    """
+    query: Optional[str] = Field(default=None, min_length=1)
+    days: Optional[int] = Field(default=None, ge=0, le=365)
+
+    @model_validator(mode="after")
+    def _require_criteria(self):
+        if self.query is None and self.days is None:
+            raise ValueError("A filter needs `query` or `days`.")
+        return self
+
+class ContactBulkSelection(BaseModel):
+    """
+    Pydantic model selecting the contacts of a bulk update or delete.
+
+    Exactly one of `ids` and `filter` must be given. With `return_ids`, the
+    IDs of the changed contacts are listed in the report.
+    """
+    ids: Optional[List[int]] = Field(default=None, min_length=1)
+    filter: Optional[ContactFilter] = None
+    return_ids: bool = False
+
+    @model_validator(mode="after")
+    def _require_one_selection(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Pass either `ids` or `filter`.")
+        return self
+
+class ContactBulkChanges(BaseModel):
+    """
+    Pydantic model for the fields a bulk update may set.
+
+    Email and phone are unique per contact, so they cannot be set in bulk.
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    first_name: Optional[str] = Field(default=None, max_length=50)
+    last_name: Optional[str] = Field(default=None, max_length=50)
+    birthday: Optional[date] = None
+    additional_data: Optional[str] = Field(default=None, max_length=255)
+
+    @model_validator(mode="after")
+    def _require_changes(self):
+        if not self.model_fields_set:
+            raise ValueError("No fields to change.")
+        for name in ("first_name", "last_name", "birthday"):
+            if name in self.model_fields_set and getattr(self, name) is None:
+                raise ValueError(f"`{name}` cannot be null.")
+        return self
+
+class ContactBulkUpdateRequest(ContactBulkSelection):
+    """
+    Pydantic model for a bulk update: the selection and the fields to set.
+    """
+    changes: ContactBulkChanges
+
+class BulkChangeReport(BaseModel):
+    """
+    Pydantic model for the result of a bulk update or delete.
+
+    `ids` is only filled when the request asked for it.
+    """
+    affected: int
+    ids: Optional[List[int]] = None
+
+class ContactChangeResponse(BaseModel):
+    """
+    Pydantic model for one entry of the change feed.
+
+    `contact` is the current state of a created or updated contact, and is
+    null for deletions.
+    """
+    op: Literal["created", "updated", "deleted"]
+    id: int
+    contact: Optional[ContactResponse] = None
+
+class ContactChangeFeed(BaseModel):
+    """
+    Pydantic model for a page of the change feed.
+
+    `cursor` is always set; pass it as `since` to get the changes that follow.
+    `has_more` tells whether they are already available.
+    """
+    changes: List[ContactChangeResponse]
+    cursor: str
+    has_more: bool
+
+class ContactDuplicateGroup(BaseModel):
+    """
+    Pydantic model for a group of contacts that look like duplicates.
+
+    `key` is the normalized value they share; for names it is the last name
+    key followed by the first name key.
+    """
+    key: List[str]
+    contacts: List[ContactResponse]